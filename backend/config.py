@@ -1,14 +1,23 @@
 """
 Configuration file for EAB Enzyme Discovery System
 """
+import hashlib
 import os
-from typing import List, Dict
+import re
+from enum import IntEnum
+from urllib.parse import urlencode
+from typing import Callable, Dict, List, Set
 
 # NCBI Configuration
 NCBI_EMAIL = os.getenv("NCBI_EMAIL", "your.email@example.com")
 NCBI_API_KEY = os.getenv("NCBI_API_KEY", None)  # Optional, increases rate limit
 NCBI_TOOL = "EAB_Enzyme_Discovery"
-NCBI_RATE_LIMIT = 0.34  # Seconds between requests (3 per second max)
+# Seconds between requests: NCBI allows 10 rps with an API key, 3 rps without
+NCBI_RATE_LIMIT = float(os.getenv("NCBI_RATE_LIMIT", "0.105" if NCBI_API_KEY else "0.34"))
+NCBI_MAX_RPS = 10 if NCBI_API_KEY else 3
+EUTILS_BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/"
+NCBI_TIMEOUT = 60  # Seconds per E-utilities request (batched efetches are slow)
+ELINK_BATCH_SIZE = 500  # IDs per ELink POST
 
 # Target Organisms
 PRIMARY_ORGANISM = "Agrilus planipennis"
@@ -59,10 +68,42 @@ ENZYME_KEYWORDS = {
     }
 }
 
+# Integer codes for enzyme types, in ENZYME_KEYWORDS order. Labels stay the
+# external representation (DB rows, exports); ENZYME_NAMES maps a code back
+# to its label and ENZYME_KEYWORD_COUNTS to its number of keywords.
+Enzyme = IntEnum("Enzyme", [
+    (enzyme_type.upper().replace("-", "_"), code)
+    for code, enzyme_type in enumerate(ENZYME_KEYWORDS)
+])
+ENZYME_NAMES = list(ENZYME_KEYWORDS)
+ENZYME_KEYWORD_COUNTS = [len(data["keywords"]) for data in ENZYME_KEYWORDS.values()]
+
+# Lowercased keyword -> enzyme code lookup (the annotator builds its
+# multi-pattern keyword scanner from this)
+KEYWORD_TO_ENZYME = {
+    keyword.lower(): Enzyme(code)
+    for code, data in enumerate(ENZYME_KEYWORDS.values())
+    for keyword in data["keywords"]
+}
+
 # Tissue Keywords
 GUT_TISSUES = ["gut", "midgut", "foregut", "hindgut", "digestive", "alimentary", "intestine"]
 DEVELOPMENTAL_STAGES = ["larva", "larval", "adult", "pupa", "pupal"]
 
+# Single-scan matchers for the lists above. The lists keep their order for
+# query building and first-match lookups; these answer "does any term
+# occur" with substring semantics ("midgut" also matches "gut").
+GUT_TISSUE_PATTERN = re.compile("|".join(map(re.escape, GUT_TISSUES)), re.IGNORECASE)
+DEV_STAGE_PATTERN = re.compile("|".join(map(re.escape, DEVELOPMENTAL_STAGES)), re.IGNORECASE)
+
+# Closed vocabularies of the matrix label columns; the matrix builder uses
+# them as the categories of its categorical columns
+CATEGORIES = {
+    "Organism": [PRIMARY_ORGANISM] + RELATED_SPECIES,
+    "Tissue": GUT_TISSUES,
+    "Stage": DEVELOPMENTAL_STAGES
+}
+
 # NCBI Databases
 DATABASES = ["nucleotide", "protein", "sra", "bioproject", "biosample"]
 
@@ -70,6 +111,18 @@ DATABASES = ["nucleotide", "protein", "sra", "bioproject", "biosample"]
 BLAST_EVALUE_THRESHOLD = 1e-20
 BLAST_IDENTITY_THRESHOLD = 50.0
 BLAST_COVERAGE_THRESHOLD = 70.0
+# NCBI asks for no more than one remote BLAST submission every 10 seconds
+BLAST_SUBMIT_INTERVAL = 10.0
+# Local DIAMOND database; when set, batches are searched locally instead of
+# through NCBI's remote BLAST service
+BLAST_LOCAL_DB = os.getenv("BLAST_LOCAL_DB")
+DIAMOND_BINARY = os.getenv("DIAMOND_BINARY", "diamond")
+# FASTA of known enzymes; when set, remote BLAST is skipped for sequences
+# whose k-mer sketch is not similar to any of them
+BLAST_PREFILTER_REFERENCE = os.getenv("BLAST_PREFILTER_REFERENCE")
+BLAST_PREFILTER_KMER = 8
+BLAST_PREFILTER_SKETCH_SIZE = 128
+BLAST_PREFILTER_THRESHOLD = 0.3
 
 # Database Configuration
 DB_PATH = os.path.join(os.path.dirname(__file__), "data", "eab_enzymes.db")
@@ -77,11 +130,30 @@ CACHE_DIR = os.path.join(os.path.dirname(__file__), "data", "cache")
 
 # Search Query Templates
 QUERY_TEMPLATES = {
-    "gut_transcriptome": '"{organism}"[Organism] AND ({tissues}) AND ({stages}) AND (transcriptome OR RNA-Seq)',
+    "gut_transcriptome": '"{organism}"[Organism] AND ({tissues}) AND ({stages}) AND (transcriptome OR "RNA-Seq" OR "RNA sequencing")',
     "enzyme_specific": '"{organism}"[Organism] AND ({enzyme_keywords})',
     "family_wide": '"{family}"[Organism] AND ({tissues}) AND ({enzyme_keywords})'
 }
 
+
+def _compile_template(template: str) -> Callable[..., str]:
+    """Split a query template into literal and placeholder segments once"""
+    parts = re.split(r"\{(\w+)\}", template)
+    literals, names = parts[::2], parts[1::2]
+
+    def render(**values: str) -> str:
+        segments = [literals[0]]
+        for name, literal in zip(names, literals[1:]):
+            segments.append(values[name])
+            segments.append(literal)
+        return "".join(segments)
+
+    return render
+
+
+# Precompiled query builders, e.g. COMPILED_QUERIES["enzyme_specific"](organism=..., enzyme_keywords=...)
+COMPILED_QUERIES = {name: _compile_template(template) for name, template in QUERY_TEMPLATES.items()}
+
 # Confidence Scoring Weights
 CONFIDENCE_WEIGHTS = {
     "blast_identity": 0.3,
@@ -89,13 +161,23 @@ CONFIDENCE_WEIGHTS = {
     "ec_match": 0.15,
     "gh_family_match": 0.15,
     "keyword_match": 0.1,
-    "gut_tissue": 0.1
+    "gut_tissue": 0.1,
+    "enzyme_score": 0.2
 }
 
+# Order of the feature columns scored by the annotator
+CONFIDENCE_FEATURE_ORDER = (
+    "keyword_match",
+    "ec_match",
+    "gh_family_match",
+    "gut_tissue",
+    "enzyme_score"
+)
+
 # Output Configuration
 MAX_RESULTS_PER_QUERY = 500
 RESULTS_DIR = os.path.join(os.path.dirname(__file__), "data", "results")
-EXPORT_FORMATS = ["csv", "json", "fasta", "excel"]
+EXPORT_FORMATS = ["csv", "json", "parquet", "fasta", "excel"]
 
 # Visualization Settings
 CHART_COLORS = {
@@ -105,8 +187,170 @@ CHART_COLORS = {
     "background": "#F5F5F5",
     "charcoal": "#1F1F1F"
 }
+PLOT_DPI = 120  # Individual analysis plots
+DASHBOARD_DPI = 300  # Summary dashboard, kept at publication resolution
+PNG_COMPRESS_LEVEL = 1  # zlib level; encoding dominates save time, files grow slightly
+HEATMAP_ANNOTATE_MAX_CELLS = 150  # Larger heatmaps are drawn without per-cell counts
+
+# Shared HTTP session for NCBI E-utilities (created on first use)
+_NCBI_SESSION = None
+
+
+def get_ncbi_session():
+    """
+    Get the pooled HTTP session shared by all NCBI E-utilities calls
+
+    Reusing one session keeps TCP/TLS connections to eutils.ncbi.nlm.nih.gov
+    alive across pipeline steps instead of reconnecting per request.
+
+    Returns:
+        requests.Session instance
+    """
+    global _NCBI_SESSION
+    if _NCBI_SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        # Back off on 429 Too Many Requests (and transient 5xx), waiting
+        # as long as NCBI's Retry-After header asks
+        retries = Retry(
+            total=3,
+            backoff_factor=1.0,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=None,
+            respect_retry_after_header=True
+        )
+
+        session = requests.Session()
+        session.headers["User-Agent"] = f"{NCBI_TOOL} ({NCBI_EMAIL})"
+        session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=retries)
+        )
+        _NCBI_SESSION = session
+    return _NCBI_SESSION
+
+
+def close_ncbi_session():
+    """
+    Close the shared NCBI session and its pooled connections
+
+    The next get_ncbi_session() call creates a fresh session.
+    """
+    global _NCBI_SESSION
+    if _NCBI_SESSION is not None:
+        _NCBI_SESSION.close()
+        _NCBI_SESSION = None
+
+
+def eutils_request(session, endpoint: str, params: Dict, post: bool = False, stream: bool = False):
+    """
+    Send an E-utilities request with the tool/email/API-key credentials
+
+    Args:
+        session: HTTP session to send the request on
+        endpoint: E-utilities endpoint (e.g., 'efetch.fcgi')
+        params: Query parameters (left unchanged)
+        post: Send the parameters as a form POST (for long ID lists)
+        stream: Leave the body unread, for incremental parsing
+
+    Returns:
+        requests.Response with a successful status; the caller closes
+        streamed responses
+
+    Raises:
+        requests.HTTPError: On an error status
+    """
+    params = dict(params, tool=NCBI_TOOL, email=NCBI_EMAIL)
+    if NCBI_API_KEY:
+        params["api_key"] = NCBI_API_KEY
+
+    url = EUTILS_BASE_URL + endpoint
+    if post:
+        response = session.post(url, data=params, timeout=NCBI_TIMEOUT, stream=stream)
+    else:
+        response = session.get(url, params=params, timeout=NCBI_TIMEOUT, stream=stream)
+
+    try:
+        response.raise_for_status()
+    except Exception:
+        response.close()
+        raise
+    return response
+
+
+# Shared on-disk cache for NCBI responses (created on first use)
+NCBI_CACHE_DIR = os.path.join(CACHE_DIR, "ncbi")
+NCBI_CACHE_EXPIRE = 7 * 24 * 3600  # seconds
+NCBI_SEARCH_CACHE_EXPIRE = 24 * 3600  # seconds; search hits change as NCBI grows
+NCBI_SEARCH_CACHE_TAG = "eutils-search"
+NCBI_CACHE_SIZE_LIMIT = 2 ** 32  # bytes
+_NCBI_CACHE = None
+
+
+def ncbi_cache_key(endpoint: str, params: Dict) -> str:
+    """
+    Build a cache key for an NCBI request
+
+    Args:
+        endpoint: E-utilities endpoint or service name
+        params: Query parameters (credentials excluded)
+
+    Returns:
+        Hex digest of the canonical request
+    """
+    canonical = endpoint + "?" + urlencode(sorted((k, str(v)) for k, v in params.items()))
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def get_ncbi_cache():
+    """
+    Get the on-disk cache shared by NCBI search and BLAST calls
+
+    Returns:
+        diskcache.Cache instance
+    """
+    global _NCBI_CACHE
+    if _NCBI_CACHE is None:
+        import diskcache
+
+        ensure_dirs(NCBI_CACHE_DIR)
+        _NCBI_CACHE = diskcache.Cache(
+            NCBI_CACHE_DIR,
+            size_limit=NCBI_CACHE_SIZE_LIMIT,
+            eviction_policy="least-recently-used",
+            tag_index=True
+        )
+    return _NCBI_CACHE
+
+
+# Directories already created by this process
+_MADE: Set[str] = set()
+
+
+def _fast_mkdir(path: str) -> None:
+    """Create a directory, walking the parent chain only when a parent is missing"""
+    try:
+        os.mkdir(path)
+    except FileExistsError:
+        pass
+    except FileNotFoundError:
+        os.makedirs(path, exist_ok=True)
+
+
+def ensure_dirs(*paths: str) -> None:
+    """
+    Create directories on demand
+
+    Directories are created by the code that writes into them rather than
+    at import time, so CLI paths that never touch disk stay side-effect free.
 
-# Create necessary directories
-os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-os.makedirs(CACHE_DIR, exist_ok=True)
-os.makedirs(RESULTS_DIR, exist_ok=True)
+    Args:
+        paths: Directory paths to create (parents included)
+    """
+    for path in paths:
+        if path in _MADE:
+            continue
+        _fast_mkdir(path)
+        _MADE.add(path)
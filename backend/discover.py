@@ -13,25 +13,25 @@ ORGANISM_PROFILES = {
         "name": "Emerald Ash Borer",
         "organism": "Agrilus planipennis",
         "description": "Wood-boring beetle devastating ash trees",
-        "config": "organism_configs.eab_config"
+        "config": None  # Defaults in config.py
     },
     "termite": {
         "name": "Termites",
         "organism": "Reticulitermes flavipes",
         "description": "Subterranean termites with symbiotic gut flora",
-        "config": "organism_configs.termite_config"
+        "config": "termite"
     },
     "bark-beetle": {
         "name": "Bark Beetles",
         "organism": "Dendroctonus ponderosae",
         "description": "Mountain Pine Beetle with fungal symbionts",
-        "config": "organism_configs.bark_beetle_config"
+        "config": "bark_beetle"
     },
     "fungus": {
         "name": "Wood-Rot Fungi",
         "organism": "Phanerochaete chrysosporium",
         "description": "White-rot fungus - nature's lignin destroyer",
-        "config": "organism_configs.fungal_config"
+        "config": "fungal"
     },
     "custom": {
         "name": "Custom Organism",
@@ -4,20 +4,14 @@ EAB Enzyme Discovery System - Main CLI
 Comprehensive pipeline for discovering wood-digesting enzymes in Emerald Ash Borer
 """
 import argparse
+import hashlib
 import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
-
-from modules.search_ncbi import create_searcher
-from modules.retrieve_sequences import create_retriever
-from modules.annotation import create_annotator
-from modules.blast_filter import create_blast_filter
-from modules.expression_validate import create_expression_validator
-from modules.storage import create_database_manager
-from modules.matrix_builder import create_matrix_builder
-from modules.visualization import create_visualizer
-from config import PRIMARY_ORGANISM, RESULTS_DIR
+from typing import Dict, List, Optional
+
+from config import PRIMARY_ORGANISM, RESULTS_DIR, ensure_dirs, close_ncbi_session, get_ncbi_session
 
 logging.basicConfig(
     level=logging.INFO,
@@ -35,16 +29,90 @@ class EABEnzymeDiscovery:
         use_blast: bool = False,
         min_confidence: float = 0.5
     ):
-        self.searcher = create_searcher()
-        self.retriever = create_retriever(use_cache=use_cache)
+        # Pipeline modules are imported here rather than at module level so
+        # that CLI paths like --stats-only don't pay for Biopython/matplotlib
+        from modules.search_ncbi import create_searcher
+        from modules.retrieve_sequences import create_retriever
+        from modules.annotation import create_annotator
+        from modules.expression_validate import create_expression_validator
+        from modules.storage import create_database_manager
+        from modules.matrix_builder import create_matrix_builder
+
+        # One pooled HTTP session serves every NCBI E-utilities call
+        session = get_ncbi_session()
+        self.searcher = create_searcher(session=session, use_cache=use_cache)
+        self.retriever = create_retriever(use_cache=use_cache, session=session)
         self.annotator = create_annotator()
-        self.blast_filter = create_blast_filter() if use_blast else None
+        self.blast_filter = None
+        if use_blast:
+            from modules.blast_filter import create_blast_filter
+            self.blast_filter = create_blast_filter(use_cache=use_cache)
         self.validator = create_expression_validator()
         self.db = create_database_manager()
         self.matrix_builder = create_matrix_builder()
-        self.visualizer = create_visualizer()
+        self.visualizer = None
+        self.use_cache = use_cache
         self.min_confidence = min_confidence
 
+    def close(self):
+        """Release the pipeline's HTTP connections, database handle and figure"""
+        self.searcher.close()
+        close_ncbi_session()
+        self.db.close()
+        if self.visualizer is not None:
+            self.visualizer.close()
+
+    def _get_visualizer(self):
+        """Create the visualizer on first use (imports matplotlib)"""
+        if self.visualizer is None:
+            from modules.visualization import create_visualizer
+            self.visualizer = create_visualizer(use_cache=self.use_cache)
+        return self.visualizer
+
+    def _fingerprint(self, sequences: List[Dict]) -> str:
+        """
+        Hash the inputs that determine the matrix and its outputs
+
+        The confidence threshold is left out: build_matrix filters with the
+        same threshold these sequences already passed, so it changes nothing
+        once the set is fixed, and sweeps over it can reuse the outputs.
+
+        Args:
+            sequences: High-confidence sequences
+
+        Returns:
+            Hex digest over sorted accession/confidence pairs
+        """
+        digest = hashlib.blake2b()
+        for entry in sorted(
+            f"{seq.get('accession', '')}:{seq.get('confidence', 0.0):.4f}"
+            for seq in sequences
+        ):
+            digest.update(entry.encode())
+            digest.update(b"\n")
+        return digest.hexdigest()
+
+    def _outputs_current(self, fingerprint_file: Path, fingerprint: str) -> bool:
+        """
+        Check whether the outputs of steps 8-10 from a previous run can be kept
+
+        Args:
+            fingerprint_file: Fingerprint written by the previous run,
+                followed by the names of the files it wrote
+            fingerprint: Fingerprint of this run's high-confidence set
+
+        Returns:
+            True if caching is enabled, the fingerprints match and every
+            recorded output file still exists
+        """
+        if not self.use_cache or not fingerprint_file.exists():
+            return False
+
+        recorded, *outputs = fingerprint_file.read_text().splitlines() or [""]
+        return recorded == fingerprint and all(
+            (fingerprint_file.parent / name).exists() for name in outputs
+        )
+
     def run_pipeline(
         self,
         organism: str = PRIMARY_ORGANISM,
@@ -99,67 +167,100 @@ class EABEnzymeDiscovery:
             logger.warning("No sequences retrieved. Exiting.")
             return
 
-        # Step 3: Annotate enzymes
+        # Step 3: Annotate enzymes (across processes for large batches)
         logger.info("\n[STEP 3] Annotating enzyme types...")
         annotated_sequences = self.annotator.annotate_batch(sequences)
 
+        # Steps 4 and 6 are chained generators, so validation and the
+        # confidence filter share one loop. The sequence dicts are annotated
+        # in place and stay referenced by `sequences`, so this saves a pass
+        # and a list of references, not the records' memory.
+
         # Step 4: Validate expression
         logger.info("\n[STEP 4] Validating tissue expression...")
-        validated_sequences = self.validator.validate_batch(annotated_sequences)
+        validated_sequences = self.validator.validate_stream(annotated_sequences)
 
         # Step 5: BLAST filtering (optional)
         if not skip_blast and self.blast_filter:
             logger.info("\n[STEP 5] Running BLAST homology analysis...")
             logger.info("WARNING: This step is very slow. Consider skipping with --skip-blast")
-            validated_sequences = self.blast_filter.annotate_with_blast(validated_sequences)
+            validated_sequences = self.blast_filter.annotate_with_blast(list(validated_sequences))
 
         # Step 6: Filter by confidence
         logger.info(f"\n[STEP 6] Filtering by confidence (min: {self.min_confidence})...")
-        high_confidence = self.annotator.filter_by_confidence(
+        high_confidence = list(self.annotator.filter_stream(
             validated_sequences,
             min_confidence=self.min_confidence
-        )
+        ))
+
+        logger.info(f"Kept {len(high_confidence)}/{len(sequences)} sequences")
 
         # Step 7: Store in database
         logger.info("\n[STEP 7] Storing results in database...")
         self.db.insert_batch(high_confidence)
 
-        # Step 8: Build digestive matrix
-        logger.info("\n[STEP 8] Building digestive enzyme matrix...")
-        matrix = self.matrix_builder.build_matrix(
-            high_confidence,
-            min_confidence=self.min_confidence
-        )
-
-        logger.info(f"Matrix contains {len(matrix)} enzymes")
-
-        # Step 9: Generate outputs
-        logger.info("\n[STEP 9] Generating outputs...")
-
+        ensure_dirs(RESULTS_DIR)
         output_dir = Path(RESULTS_DIR)
-        output_dir.mkdir(parents=True, exist_ok=True)
 
-        # Export matrix
         matrix_file = output_dir / "digestive_matrix.csv"
-        self.matrix_builder.export_matrix(matrix, matrix_file, format="csv")
-
         matrix_json = output_dir / "digestive_matrix.json"
-        self.matrix_builder.export_matrix(matrix, matrix_json, format="json")
-
-        # Generate report
+        matrix_parquet = output_dir / "digestive_matrix.parquet"
         report_file = output_dir / "discovery_report.txt"
-        self.matrix_builder.generate_report(matrix, report_file)
 
-        # Generate visualizations
-        logger.info("\n[STEP 10] Creating visualizations...")
-        self.visualizer.generate_all_plots(matrix)
+        # Steps 8-10 are skipped when the high-confidence set is the same as
+        # in the previous run (e.g. re-runs during parameter sweeps)
+        fingerprint = self._fingerprint(high_confidence)
+        fingerprint_file = output_dir / ".fingerprint"
+        if self._outputs_current(fingerprint_file, fingerprint):
+            logger.info("\nMatrix unchanged, skipping rebuild (steps 8-10)")
+            matrix = self.matrix_builder.load_matrix(matrix_parquet)
+            summary = self.matrix_builder.generate_summary(matrix)
+        else:
+            # Step 8: Build digestive matrix
+            logger.info("\n[STEP 8] Building digestive enzyme matrix...")
+            matrix = self.matrix_builder.build_matrix(
+                high_confidence,
+                min_confidence=self.min_confidence
+            )
+
+            logger.info(f"Matrix contains {len(matrix)} enzymes")
+            # Shared by the report and the final log below
+            summary = self.matrix_builder.generate_summary(matrix)
+
+            # Step 9: Generate outputs
+            logger.info("\n[STEP 9] Generating outputs...")
+
+            # Exports are disk-bound and plotting is CPU-bound, so the writes
+            # run on worker threads while the main thread renders. The matrix
+            # is read-only until all of them finish.
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                writes = [
+                    executor.submit(self.matrix_builder.export_matrix, matrix, matrix_file, "csv"),
+                    executor.submit(self.matrix_builder.export_matrix, matrix, matrix_json, "json"),
+                    executor.submit(self.matrix_builder.export_matrix, matrix, matrix_parquet, "parquet"),
+                    executor.submit(self.matrix_builder.generate_report, matrix, report_file, summary)
+                ]
+
+                # Step 10: Generate visualizations
+                logger.info("\n[STEP 10] Creating visualizations...")
+                plot_files = self._get_visualizer().generate_all_plots(matrix)
+
+                for write in writes:
+                    write.result()
+
+            # Written last, so an interrupted run never looks up to date.
+            # The files written are listed after the fingerprint, so a
+            # later run rebuilds if any of them has gone missing.
+            outputs = [matrix_file, matrix_json, matrix_parquet, report_file, *plot_files]
+            fingerprint_file.write_text(
+                "\n".join([fingerprint, *(path.name for path in outputs)]) + "\n"
+            )
 
         # Final summary
         logger.info("\n" + "=" * 80)
         logger.info("PIPELINE COMPLETE!")
         logger.info("=" * 80)
 
-        summary = self.matrix_builder.generate_summary(matrix)
         logger.info(f"\nTotal enzymes identified: {summary['total_enzymes']}")
         logger.info(f"High confidence (≥0.8): {summary['high_confidence_count']}")
         logger.info(f"Gut-expressed: {summary['gut_expressed_count']}")
@@ -167,6 +268,7 @@ class EABEnzymeDiscovery:
 
         logger.info(f"\nResults saved to: {output_dir}")
         logger.info(f"  - Digestive matrix: {matrix_file}")
+        logger.info(f"  - Columnar matrix: {matrix_parquet}")
         logger.info(f"  - Detailed report: {report_file}")
         logger.info(f"  - Visualizations: {output_dir}")
 
@@ -249,8 +351,10 @@ Examples:
 
     # Show database stats if requested
     if args.stats_only:
-        db = create_database_manager()
-        stats = db.get_statistics()
+        from modules.storage import create_database_manager
+
+        with create_database_manager() as db:
+            stats = db.get_statistics()
 
         print("\n" + "=" * 60)
         print("DATABASE STATISTICS")
@@ -270,6 +374,7 @@ Examples:
         return
 
     # Run pipeline
+    pipeline = None
     try:
         pipeline = EABEnzymeDiscovery(
             use_cache=not args.no_cache,
@@ -291,6 +396,9 @@ Examples:
     except Exception as e:
         logger.error(f"Pipeline failed: {e}", exc_info=True)
         sys.exit(1)
+    finally:
+        if pipeline is not None:
+            pipeline.close()
 
 
 if __name__ == "__main__":
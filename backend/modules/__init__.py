@@ -2,18 +2,13 @@
 EAB Enzyme Discovery System - Core Modules
 """
 
+import importlib
+
 __version__ = "1.0.0"
 __author__ = "EAB Research Team"
 
-from . import search_ncbi
-from . import retrieve_sequences
-from . import annotation
-from . import blast_filter
-from . import expression_validate
-from . import storage
-from . import matrix_builder
-from . import visualization
-
+# Submodules are imported on first attribute access (PEP 562) so that light
+# CLI paths don't pull in Biopython, pandas or matplotlib.
 __all__ = [
     "search_ncbi",
     "retrieve_sequences",
@@ -22,5 +17,16 @@ __all__ = [
     "expression_validate",
     "storage",
     "matrix_builder",
-    "visualization"
+    "visualization",
+    "rate_limit",
+    "fasta_parser",
+    "kmer_sketch"
 ]
+
+
+def __getattr__(name):
+    if name in __all__:
+        module = importlib.import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
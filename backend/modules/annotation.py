@@ -2,43 +2,130 @@
 Annotation Module
 Classifies and annotates enzyme sequences with functional information
 """
+import heapq
+import os
 import re
-from typing import Dict, List, Optional, Set, Tuple
+import sys
+from multiprocessing import Pool
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from collections import Counter
 import logging
+import ahocorasick
+import numpy as np
 
-from ..config import ENZYME_KEYWORDS, GUT_TISSUES, CONFIDENCE_WEIGHTS
+from ..config import (
+    GUT_TISSUE_PATTERN, CONFIDENCE_WEIGHTS, CONFIDENCE_FEATURE_ORDER,
+    KEYWORD_TO_ENZYME, ENZYME_NAMES, ENZYME_KEYWORD_COUNTS
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _is_word_char(char: str) -> bool:
+    """Match the regex \\w class used for keyword boundaries"""
+    return char.isalnum() or char == "_"
+
+
+def _build_keyword_automaton() -> ahocorasick.Automaton:
+    """Build an Aho-Corasick automaton over all lowercased enzyme keywords"""
+    automaton = ahocorasick.Automaton()
+    for keyword, code in KEYWORD_TO_ENZYME.items():
+        automaton.add_word(keyword, (code, keyword))
+    automaton.make_automaton()
+    return automaton
+
+
+# Matchers are built once at import and shared by every annotator (and
+# inherited by forked workers) instead of being rebuilt per instance
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
+# Position of each keyword in ENZYME_KEYWORDS, for ordering matches
+_KEYWORD_RANK = {keyword: rank for rank, keyword in enumerate(KEYWORD_TO_ENZYME)}
+# GH/AA families and EC numbers in one alternation, so the text is scanned
+# once. A family starts with a letter and an EC number with a digit, so
+# their matches never overlap. Runs on lowercased text, so no IGNORECASE
+# is needed.
+_FAMILY_EC_PATTERN = re.compile(
+    r'\b(?:(?P<gh>gh\d+|aa\d+|ce\d+|pl\d+)|(?P<ec>\d+\.\d+\.\d+\.\d+))\b'
+)
+
+
+def _feature_text(features: List) -> str:
+    """
+    Join the searchable text of parsed features
+
+    Uses feature types and qualifier values rather than the repr of the
+    whole list, which would add brackets, quotes, keys and locations.
+
+    Args:
+        features: Feature dictionaries from the sequence parser
+
+    Returns:
+        Space-separated feature text
+    """
+    parts = []
+    for feature in features:
+        if not isinstance(feature, dict):
+            parts.append(str(feature))
+            continue
+        parts.append(feature.get("type", ""))
+        parts.extend(
+            value for value in feature.get("qualifiers", {}).values() if isinstance(value, str)
+        )
+    return " ".join(parts)
+
+
+# Sort keys for rank_sequences
+def _confidence_key(seq: Dict) -> float:
+    return seq.get("confidence", 0)
+
+
+def _length_key(seq: Dict) -> int:
+    return seq.get("length", 0)
+
+
+def _enzyme_score_key(seq: Dict) -> float:
+    return max(seq.get("annotation", {}).get("enzyme_scores", {}).values(), default=0)
+
+
+# Batches smaller than this are annotated in-process
+PARALLEL_THRESHOLD = 500
+
+# Per-process annotator used by annotate_batch's worker pool
+_worker_annotator = None
+
+
+def _init_worker():
+    """Build one annotator per worker process"""
+    global _worker_annotator
+    _worker_annotator = EnzymeAnnotator()
+
+
+def _classify_worker(sequence_data: Dict) -> Dict:
+    """Classify one sequence in a worker process (confidence is scored by the parent)"""
+    return _worker_annotator.classify_enzyme(sequence_data, score=False)
+
+
 class EnzymeAnnotator:
     """Annotate and classify enzyme sequences"""
 
     def __init__(self):
-        self.enzyme_patterns = self._compile_patterns()
-        self.gh_pattern = re.compile(r'\b(GH\d+|AA\d+|CE\d+|PL\d+)\b', re.IGNORECASE)
-        self.ec_pattern = re.compile(r'\b(\d+\.\d+\.\d+\.\d+)\b')
-
-    def _compile_patterns(self) -> Dict[str, List[re.Pattern]]:
-        """Compile regex patterns for enzyme keywords"""
-        patterns = {}
-        for enzyme_type, data in ENZYME_KEYWORDS.items():
-            enzyme_patterns = []
-            for keyword in data["keywords"]:
-                # Create case-insensitive pattern with word boundaries
-                pattern = re.compile(r'\b' + re.escape(keyword) + r'\b', re.IGNORECASE)
-                enzyme_patterns.append(pattern)
-            patterns[enzyme_type] = enzyme_patterns
-        return patterns
-
-    def classify_enzyme(self, sequence_data: Dict) -> Dict:
+        self.keyword_automaton = _KEYWORD_AUTOMATON
+        self.keyword_rank = _KEYWORD_RANK
+        self.family_ec_pattern = _FAMILY_EC_PATTERN
+        self.confidence_weights = np.array(
+            [CONFIDENCE_WEIGHTS[feature] for feature in CONFIDENCE_FEATURE_ORDER],
+            dtype=np.float64
+        )
+
+    def classify_enzyme(self, sequence_data: Dict, score: bool = True) -> Dict:
         """
         Classify an enzyme based on its metadata
 
         Args:
             sequence_data: Parsed sequence dictionary
+            score: Compute the confidence score (batch callers score
+                many classifications at once instead)
 
         Returns:
             Dictionary with classification results
@@ -59,55 +146,91 @@ class EnzymeAnnotator:
             sequence_data.get("protein_name", ""),
             sequence_data.get("gene_name", ""),
             " ".join(sequence_data.get("keywords", [])),
-            str(sequence_data.get("features", []))
+            _feature_text(sequence_data.get("features", []))
         ])
+        # Lowercased once and shared by every check below
+        search_text_lower = search_text.lower()
+
+        # Find every enzyme keyword in a single scan of the text. The
+        # automaton reports overlapping hits ("peroxidase" inside "lignin
+        # peroxidase"); the boundary check keeps whole-word semantics.
+        found = set()
+        type_matches = Counter()
+        for end, (code, keyword) in self.keyword_automaton.iter(search_text_lower):
+            start = end - len(keyword) + 1
+            if start > 0 and _is_word_char(search_text_lower[start - 1]):
+                continue
+            if end + 1 < len(search_text_lower) and _is_word_char(search_text_lower[end + 1]):
+                continue
+            if keyword not in found:
+                found.add(keyword)
+                type_matches[code] += 1
+
+        # Classify enzyme type by keyword matching (codes sort in
+        # ENZYME_KEYWORDS order)
+        for code in sorted(type_matches):
+            enzyme_type = ENZYME_NAMES[code]
+            classification["enzyme_types"].append(enzyme_type)
+            classification["enzyme_scores"][enzyme_type] = type_matches[code] / ENZYME_KEYWORD_COUNTS[code]
+
+        # Extract GH/AA families and EC numbers in a single scan
+        gh_matches = []
+        ec_matches = []
+        for match in self.family_ec_pattern.finditer(search_text_lower):
+            if match.lastgroup == "gh":
+                gh_matches.append(match.group("gh").upper())
+            else:
+                ec_matches.append(match.group("ec"))
+        classification["gh_families"] = list(set(gh_matches))
 
-        # Classify enzyme type by keyword matching
-        for enzyme_type, patterns in self.enzyme_patterns.items():
-            matches = 0
-            for pattern in patterns:
-                if pattern.search(search_text):
-                    matches += 1
-
-            if matches > 0:
-                classification["enzyme_types"].append(enzyme_type)
-                classification["enzyme_scores"][enzyme_type] = matches / len(patterns)
-
-        # Extract GH/AA families
-        gh_matches = self.gh_pattern.findall(search_text)
-        classification["gh_families"] = list(set([gh.upper() for gh in gh_matches]))
-
-        # Extract EC numbers
         if sequence_data.get("ec_number"):
             classification["ec_numbers"].append(sequence_data["ec_number"])
 
-        ec_matches = self.ec_pattern.findall(search_text)
         classification["ec_numbers"].extend(ec_matches)
         classification["ec_numbers"] = list(set(classification["ec_numbers"]))
 
         # Check gut tissue expression
-        tissue = sequence_data.get("tissue", "").lower()
-        for gut_tissue in GUT_TISSUES:
-            if gut_tissue in tissue or gut_tissue in search_text.lower():
-                classification["is_gut_expressed"] = True
-                break
-
-        # Extract keywords found
-        all_keywords = []
-        for enzyme_data in ENZYME_KEYWORDS.values():
-            all_keywords.extend(enzyme_data["keywords"])
+        classification["is_gut_expressed"] = bool(
+            GUT_TISSUE_PATTERN.search(sequence_data.get("tissue", ""))
+            or GUT_TISSUE_PATTERN.search(search_text_lower)
+        )
 
-        for keyword in set(all_keywords):
-            if re.search(r'\b' + re.escape(keyword) + r'\b', search_text, re.IGNORECASE):
-                classification["keywords_found"].append(keyword)
+        # Keywords found (reuses the single scan above)
+        classification["keywords_found"] = sorted(found, key=self.keyword_rank.__getitem__)
 
         # Calculate confidence score
-        classification["confidence"] = self.calculate_confidence(
-            sequence_data, classification
-        )
+        if score:
+            classification["confidence"] = self.calculate_confidence(
+                sequence_data, classification
+            )
 
         return classification
 
+    def _confidence_features(self, classification: Dict) -> Tuple[float, ...]:
+        """
+        Build the confidence feature vector for a classification
+
+        Args:
+            classification: Classification results
+
+        Returns:
+            Feature values in CONFIDENCE_FEATURE_ORDER
+        """
+        # Keyword match score
+        keyword_score = min(len(classification["keywords_found"]) / 5.0, 1.0)
+
+        # Average enzyme scores
+        enzyme_scores = classification["enzyme_scores"]
+        avg_enzyme_score = sum(enzyme_scores.values()) / len(enzyme_scores) if enzyme_scores else 0.0
+
+        return (
+            keyword_score,
+            1.0 if classification["ec_numbers"] else 0.0,
+            1.0 if classification["gh_families"] else 0.0,
+            1.0 if classification["is_gut_expressed"] else 0.0,
+            avg_enzyme_score
+        )
+
     def calculate_confidence(
         self,
         sequence_data: Dict,
@@ -123,60 +246,95 @@ class EnzymeAnnotator:
         Returns:
             Confidence score (0.0 to 1.0)
         """
-        score = 0.0
-
-        # Keyword match score
-        if classification["keywords_found"]:
-            keyword_score = min(len(classification["keywords_found"]) / 5.0, 1.0)
-            score += CONFIDENCE_WEIGHTS["keyword_match"] * keyword_score
-
-        # EC number match
-        if classification["ec_numbers"]:
-            score += CONFIDENCE_WEIGHTS["ec_match"]
-
-        # GH family match
-        if classification["gh_families"]:
-            score += CONFIDENCE_WEIGHTS["gh_family_match"]
-
-        # Gut tissue expression
-        if classification["is_gut_expressed"]:
-            score += CONFIDENCE_WEIGHTS["gut_tissue"]
-
-        # Has enzyme type classification
-        if classification["enzyme_types"]:
-            # Average enzyme scores
-            avg_enzyme_score = sum(classification["enzyme_scores"].values()) / len(classification["enzyme_scores"])
-            score += 0.2 * avg_enzyme_score
+        features = self._confidence_features(classification)
+        score = float(np.dot(self.confidence_weights, features))
 
         # Normalize to 0.0-1.0 range
         return min(score, 1.0)
 
-    def annotate_batch(self, sequences: List[Dict]) -> List[Dict]:
+    def annotate_batch(
+        self,
+        sequences: List[Dict],
+        n_workers: Optional[int] = None
+    ) -> List[Dict]:
         """
         Annotate a batch of sequences
 
+        Large batches are classified across worker processes; below
+        PARALLEL_THRESHOLD the process start-up cost outweighs the gain.
+
         Args:
             sequences: List of parsed sequence dictionaries
+            n_workers: Number of worker processes (default: CPU count)
 
         Returns:
             List of sequences with added annotation data
         """
-        annotated = []
+        if len(sequences) < PARALLEL_THRESHOLD:
+            annotated = list(self.annotate_stream(sequences))
+        else:
+            with Pool(n_workers or os.cpu_count(), initializer=_init_worker) as pool:
+                # imap (not imap_unordered) keeps results in input order
+                classifications = list(pool.imap(_classify_worker, sequences, chunksize=64))
+            annotated = list(self._apply_classifications(sequences, classifications))
+
+        logger.info(f"Annotated {len(annotated)} sequences")
+        return annotated
+
+    def annotate_stream(
+        self,
+        sequences: Iterable[Dict],
+        chunk_size: int = 256
+    ) -> Iterator[Dict]:
+        """
+        Lazily annotate sequences in small chunks
 
+        Args:
+            sequences: Iterable of parsed sequence dictionaries
+            chunk_size: Number of sequences scored together
+
+        Yields:
+            Sequences with added annotation data
+        """
+        chunk = []
         for seq in sequences:
-            classification = self.classify_enzyme(seq)
+            chunk.append(seq)
+            if len(chunk) >= chunk_size:
+                yield from self._annotate_chunk(chunk)
+                chunk = []
 
-            # Add classification to sequence data
+        if chunk:
+            yield from self._annotate_chunk(chunk)
+
+    def _annotate_chunk(self, chunk: List[Dict]) -> Iterator[Dict]:
+        """Annotate a chunk of sequences, scoring confidence as one matrix product"""
+        classifications = [self.classify_enzyme(seq, score=False) for seq in chunk]
+        return self._apply_classifications(chunk, classifications)
+
+    def _apply_classifications(
+        self,
+        chunk: List[Dict],
+        classifications: List[Dict]
+    ) -> Iterator[Dict]:
+        """Score unscored classifications together and attach them to their sequences"""
+        features = np.empty((len(chunk), len(CONFIDENCE_FEATURE_ORDER)), dtype=np.float64)
+        for i, classification in enumerate(classifications):
+            features[i] = self._confidence_features(classification)
+        confidences = np.minimum(features @ self.confidence_weights, 1.0)
+
+        for seq, classification, confidence in zip(chunk, classifications, confidences):
+            classification["confidence"] = float(confidence)
+
+            # Add classification to sequence data. Labels come from a small
+            # vocabulary but are fresh objects per regex match (and per
+            # unpickle from workers), so intern them to share one copy.
             seq["annotation"] = classification
-            seq["enzyme_type"] = classification["enzyme_types"][0] if classification["enzyme_types"] else "unknown"
+            seq["enzyme_type"] = sys.intern(classification["enzyme_types"][0]) if classification["enzyme_types"] else "unknown"
             seq["confidence"] = classification["confidence"]
-            seq["gh_family"] = classification["gh_families"][0] if classification["gh_families"] else None
-            seq["ec_number_annotated"] = classification["ec_numbers"][0] if classification["ec_numbers"] else seq.get("ec_number")
+            seq["gh_family"] = sys.intern(classification["gh_families"][0]) if classification["gh_families"] else None
+            seq["ec_number_annotated"] = sys.intern(classification["ec_numbers"][0]) if classification["ec_numbers"] else seq.get("ec_number")
 
-            annotated.append(seq)
-
-        logger.info(f"Annotated {len(annotated)} sequences")
-        return annotated
+            yield seq
 
     def filter_by_confidence(
         self,
@@ -197,6 +355,25 @@ class EnzymeAnnotator:
         logger.info(f"Filtered {len(sequences)} sequences to {len(filtered)} (min confidence: {min_confidence})")
         return filtered
 
+    def filter_stream(
+        self,
+        sequences: Iterable[Dict],
+        min_confidence: float = 0.5
+    ) -> Iterator[Dict]:
+        """
+        Lazily filter sequences by confidence threshold
+
+        Args:
+            sequences: Iterable of annotated sequences
+            min_confidence: Minimum confidence score
+
+        Yields:
+            Sequences meeting the threshold
+        """
+        for seq in sequences:
+            if seq.get("confidence", 0) >= min_confidence:
+                yield seq
+
     def get_enzyme_statistics(self, sequences: List[Dict]) -> Dict:
         """
         Generate statistics about enzyme types in the dataset
@@ -218,47 +395,36 @@ class EnzymeAnnotator:
             "high_confidence_count": 0
         }
 
-        confidences = []
+        # Counter.update runs each counting loop in C
+        stats["enzyme_type_counts"].update(seq.get("enzyme_type", "unknown") for seq in sequences)
+        stats["gh_family_counts"].update(
+            gh_family for gh_family in (seq.get("gh_family") for seq in sequences) if gh_family
+        )
+        stats["ec_number_counts"].update(
+            ec for ec in (seq.get("ec_number_annotated") for seq in sequences) if ec
+        )
+        stats["organism_counts"].update(seq.get("organism", "unknown") for seq in sequences)
+        stats["tissue_counts"].update(seq.get("tissue", "unknown") for seq in sequences)
 
+        # Confidence stats (running totals, no intermediate list)
+        confidence_sum = 0.0
         for seq in sequences:
-            # Count enzyme types
-            enzyme_type = seq.get("enzyme_type", "unknown")
-            stats["enzyme_type_counts"][enzyme_type] += 1
-
-            # Count GH families
-            gh_family = seq.get("gh_family")
-            if gh_family:
-                stats["gh_family_counts"][gh_family] += 1
-
-            # Count EC numbers
-            ec = seq.get("ec_number_annotated")
-            if ec:
-                stats["ec_number_counts"][ec] += 1
-
-            # Count organisms
-            organism = seq.get("organism", "unknown")
-            stats["organism_counts"][organism] += 1
-
-            # Count tissues
-            tissue = seq.get("tissue", "unknown")
-            stats["tissue_counts"][tissue] += 1
-
-            # Confidence stats
             confidence = seq.get("confidence", 0)
-            confidences.append(confidence)
+            confidence_sum += confidence
             if confidence >= 0.8:
                 stats["high_confidence_count"] += 1
 
         # Calculate average confidence
-        if confidences:
-            stats["avg_confidence"] = sum(confidences) / len(confidences)
+        if sequences:
+            stats["avg_confidence"] = confidence_sum / len(sequences)
 
         return stats
 
     def rank_sequences(
         self,
         sequences: List[Dict],
-        criteria: str = "confidence"
+        criteria: str = "confidence",
+        top_k: Optional[int] = None
     ) -> List[Dict]:
         """
         Rank sequences by specified criteria
@@ -266,22 +432,25 @@ class EnzymeAnnotator:
         Args:
             sequences: List of annotated sequences
             criteria: Ranking criteria ('confidence', 'length', 'enzyme_score')
+            top_k: Only return the k best sequences
 
         Returns:
             Sorted list of sequences
         """
         if criteria == "confidence":
-            return sorted(sequences, key=lambda x: x.get("confidence", 0), reverse=True)
+            key = _confidence_key
         elif criteria == "length":
-            return sorted(sequences, key=lambda x: x.get("length", 0), reverse=True)
+            key = _length_key
         elif criteria == "enzyme_score":
-            return sorted(
-                sequences,
-                key=lambda x: max(x.get("annotation", {}).get("enzyme_scores", {}).values(), default=0),
-                reverse=True
-            )
+            key = _enzyme_score_key
         else:
-            return sequences
+            return sequences if top_k is None else sequences[:top_k]
+
+        # sorted() computes each key once; for a top-k cut a bounded heap
+        # avoids sorting the whole list (same order, ties included)
+        if top_k is not None:
+            return heapq.nlargest(top_k, sequences, key=key)
+        return sorted(sequences, key=key, reverse=True)
 
 
 def create_annotator() -> EnzymeAnnotator:
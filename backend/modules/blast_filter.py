@@ -2,21 +2,56 @@
 BLAST Filter Module
 Performs homology-based filtering of enzyme candidates
 """
-from typing import List, Dict, Optional
+import os
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
 from Bio.Blast import NCBIWWW, NCBIXML
 import logging
-import time
 
 from ..config import (
     BLAST_EVALUE_THRESHOLD,
     BLAST_IDENTITY_THRESHOLD,
-    BLAST_COVERAGE_THRESHOLD
+    BLAST_COVERAGE_THRESHOLD,
+    BLAST_LOCAL_DB,
+    BLAST_PREFILTER_REFERENCE,
+    BLAST_PREFILTER_KMER,
+    BLAST_PREFILTER_SKETCH_SIZE,
+    BLAST_PREFILTER_THRESHOLD,
+    BLAST_SUBMIT_INTERVAL,
+    DIAMOND_BINARY,
+    NCBI_CACHE_EXPIRE,
+    get_ncbi_cache,
+    ncbi_cache_key
 )
+from .fasta_parser import read_fasta
+from .kmer_sketch import SketchIndex
+from .rate_limit import RateLimiter
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _hit_dict(alignment, hsp, identity: float, coverage: float) -> Dict:
+    """Build the hit dictionary for one HSP of a BLAST alignment"""
+    return {
+        "subject_id": alignment.hit_id,
+        "subject_def": alignment.hit_def,
+        "evalue": hsp.expect,
+        "bitscore": hsp.bits,
+        "identity": identity,
+        "coverage": coverage,
+        "alignment_length": hsp.align_length,
+        "query_start": hsp.query_start,
+        "query_end": hsp.query_end,
+        "subject_start": hsp.sbjct_start,
+        "subject_end": hsp.sbjct_end,
+        "gaps": hsp.gaps
+    }
+
+
 class BLASTFilter:
     """Filter enzyme sequences using BLAST homology search"""
 
@@ -24,11 +59,28 @@ class BLASTFilter:
         self,
         evalue_threshold: float = BLAST_EVALUE_THRESHOLD,
         identity_threshold: float = BLAST_IDENTITY_THRESHOLD,
-        coverage_threshold: float = BLAST_COVERAGE_THRESHOLD
+        coverage_threshold: float = BLAST_COVERAGE_THRESHOLD,
+        use_cache: bool = True,
+        local_db: Optional[str] = BLAST_LOCAL_DB,
+        prefilter_reference: Optional[str] = BLAST_PREFILTER_REFERENCE,
+        prefilter_threshold: float = BLAST_PREFILTER_THRESHOLD
     ):
         self.evalue_threshold = evalue_threshold
         self.identity_threshold = identity_threshold
         self.coverage_threshold = coverage_threshold
+        self.local_db = local_db
+        self.cache = get_ncbi_cache() if use_cache else None
+        self.prefilter_threshold = prefilter_threshold
+        # Remote submissions from all threads share one token bucket;
+        # qblast itself only spaces out its own result polling
+        self.submit_limiter = RateLimiter(rate=1.0 / BLAST_SUBMIT_INTERVAL)
+        self.prefilter = None
+        if prefilter_reference:
+            self.prefilter = SketchIndex(
+                (sequence for _, sequence in read_fasta(prefilter_reference)),
+                k=BLAST_PREFILTER_KMER,
+                size=BLAST_PREFILTER_SKETCH_SIZE
+            )
 
     def run_blast_remote(
         self,
@@ -36,7 +88,7 @@ class BLASTFilter:
         database: str = "nr",
         program: str = "blastp",
         entrez_query: Optional[str] = None
-    ) -> Optional[str]:
+    ) -> Optional[IO]:
         """
         Run BLAST search against NCBI database
 
@@ -47,8 +99,25 @@ class BLASTFilter:
             entrez_query: Optional Entrez query to filter results
 
         Returns:
-            BLAST results in XML format
+            Handle over the BLAST XML results, or None on error
         """
+        query = {
+            "program": program,
+            "database": database,
+            "sequence": sequence,
+            "entrez_query": entrez_query or "",
+            "expect": self.evalue_threshold * 10,  # Get more results for filtering
+            "hitlist_size": 50
+        }
+        key = ncbi_cache_key("qblast", query)
+        if self.cache is not None:
+            blast_results = self.cache.get(key)
+            if blast_results is not None:
+                return StringIO(blast_results)
+
+        # Only searches that reach NCBI wait for a submission slot
+        self.submit_limiter.wait()
+
         try:
             logger.info(f"Running {program} search against {database}...")
 
@@ -57,87 +126,180 @@ class BLASTFilter:
                 database=database,
                 sequence=sequence,
                 entrez_query=entrez_query,
-                expect=self.evalue_threshold * 10,  # Get more results for filtering
-                hitlist_size=50
+                expect=query["expect"],
+                hitlist_size=query["hitlist_size"]
             )
 
+            if self.cache is None:
+                return result_handle
+
+            # The cache needs the text, so buffer it once and parse from that
             blast_results = result_handle.read()
             result_handle.close()
+            self.cache.set(key, blast_results, expire=NCBI_CACHE_EXPIRE)
 
-            return blast_results
+            return StringIO(blast_results)
 
         except Exception as e:
             logger.error(f"Error running BLAST: {e}")
             return None
 
-    def parse_blast_results(self, blast_xml: str) -> List[Dict]:
+    def run_blast_local(
+        self,
+        sequences: List[Dict],
+        db_path: Optional[str] = None,
+        threads: int = 8
+    ) -> List[List[Dict]]:
         """
-        Parse BLAST XML results
+        Search many sequences at once against a local DIAMOND database
+
+        All queries go into one multi-FASTA file so the database is loaded
+        once for the whole batch.
 
         Args:
-            blast_xml: BLAST results in XML format
+            sequences: List of sequence dictionaries with 'sequence'
+            db_path: DIAMOND database path (defaults to BLAST_LOCAL_DB)
+            threads: Number of DIAMOND threads
 
         Returns:
-            List of hit dictionaries
+            Filtered hits for each input sequence, in input order
+        """
+        db_path = db_path or self.local_db
+        results = [[] for _ in sequences]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            query_file = os.path.join(tmp_dir, "query.fasta")
+            output_file = os.path.join(tmp_dir, "hits.xml")
+
+            # Queries are named by position so hits map straight back
+            with open(query_file, 'w') as f:
+                for i, seq_data in enumerate(sequences):
+                    f.write(f">{i}\n{seq_data['sequence']}\n")
+
+            logger.info(f"Running DIAMOND blastp for {len(sequences)} sequences against {db_path}...")
+            subprocess.run(
+                [
+                    DIAMOND_BINARY, "blastp",
+                    "-d", db_path,
+                    "-q", query_file,
+                    "-o", output_file,
+                    "-f", "5",
+                    "-e", str(self.evalue_threshold * 10),  # Get more results for filtering
+                    "-p", str(threads),
+                    "-k", "50"
+                ],
+                check=True,
+                capture_output=True
+            )
+
+            with open(output_file, 'r') as handle:
+                for blast_record in NCBIXML.parse(handle):
+                    index = int(blast_record.query.split()[0])
+                    results[index] = list(self._passing_hits(blast_record))
+
+        return results
+
+    def _record_hits(self, blast_record) -> Iterator[Dict]:
+        """Yield the HSPs of one BLAST record as hit dictionaries"""
+        for alignment in blast_record.alignments:
+            for hsp in alignment.hsps:
+                # Calculate metrics
+                identity = (hsp.identities / hsp.align_length) * 100
+                coverage = (hsp.align_length / blast_record.query_length) * 100
+
+                yield _hit_dict(alignment, hsp, identity, coverage)
+
+    def parse_blast_results(self, result_handle: IO) -> Iterator[Dict]:
         """
-        from io import StringIO
+        Stream hits from BLAST XML results
 
-        hits = []
+        Records are parsed incrementally from the handle, so the XML is
+        never held as a second in-memory copy.
+
+        Args:
+            result_handle: File-like object over BLAST XML
 
+        Yields:
+            Hit dictionaries
+        """
         try:
-            result_handle = StringIO(blast_xml)
-            blast_records = NCBIXML.parse(result_handle)
-
-            for blast_record in blast_records:
-                for alignment in blast_record.alignments:
-                    for hsp in alignment.hsps:
-                        # Calculate metrics
-                        identity = (hsp.identities / hsp.align_length) * 100
-                        coverage = (hsp.align_length / blast_record.query_length) * 100
-
-                        hit = {
-                            "subject_id": alignment.hit_id,
-                            "subject_def": alignment.hit_def,
-                            "evalue": hsp.expect,
-                            "bitscore": hsp.bits,
-                            "identity": identity,
-                            "coverage": coverage,
-                            "alignment_length": hsp.align_length,
-                            "query_start": hsp.query_start,
-                            "query_end": hsp.query_end,
-                            "subject_start": hsp.sbjct_start,
-                            "subject_end": hsp.sbjct_end,
-                            "gaps": hsp.gaps
-                        }
-
-                        hits.append(hit)
+            for blast_record in NCBIXML.parse(result_handle):
+                yield from self._record_hits(blast_record)
+
+        except Exception as e:
+            logger.error(f"Error parsing BLAST results: {e}")
 
+        finally:
             result_handle.close()
 
+    def _passing_hits(self, blast_record) -> Iterator[Dict]:
+        """Yield only the HSPs of one BLAST record that pass all thresholds"""
+        for alignment in blast_record.alignments:
+            for hsp in alignment.hsps:
+                if hsp.expect > self.evalue_threshold:
+                    continue
+                identity = (hsp.identities / hsp.align_length) * 100
+                if identity < self.identity_threshold:
+                    continue
+                coverage = (hsp.align_length / blast_record.query_length) * 100
+                if coverage < self.coverage_threshold:
+                    continue
+
+                yield _hit_dict(alignment, hsp, identity, coverage)
+
+    def parse_filter_score(self, result_handle: IO) -> Tuple[List[Dict], float]:
+        """
+        Parse, filter and score BLAST XML results in a single pass
+
+        HSPs are tested against the thresholds before a hit dictionary is
+        built, and the best hit is tracked as hits are accepted.
+
+        Args:
+            result_handle: File-like object over BLAST XML
+
+        Returns:
+            Tuple of (filtered hits, homology score)
+        """
+        hits = []
+        best_hit = None
+
+        try:
+            for blast_record in NCBIXML.parse(result_handle):
+                for hit in self._passing_hits(blast_record):
+                    hits.append(hit)
+                    if best_hit is None or hit["bitscore"] > best_hit["bitscore"]:
+                        best_hit = hit
+
         except Exception as e:
             logger.error(f"Error parsing BLAST results: {e}")
 
-        return hits
+        finally:
+            result_handle.close()
+
+        logger.info(f"Kept {len(hits)} high-quality BLAST matches")
+        return hits, self._score_hit(best_hit) if best_hit else 0.0
 
-    def filter_hits(self, hits: List[Dict]) -> List[Dict]:
+    def filter_hits(self, hits: Iterable[Dict]) -> List[Dict]:
         """
         Filter BLAST hits by thresholds
 
         Args:
-            hits: List of BLAST hit dictionaries
+            hits: Iterable of BLAST hit dictionaries
 
         Returns:
             Filtered list of high-quality hits
         """
         filtered = []
+        total = 0
 
         for hit in hits:
+            total += 1
             if (hit["evalue"] <= self.evalue_threshold and
                 hit["identity"] >= self.identity_threshold and
                 hit["coverage"] >= self.coverage_threshold):
                 filtered.append(hit)
 
-        logger.info(f"Filtered {len(hits)} hits to {len(filtered)} high-quality matches")
+        logger.info(f"Filtered {total} hits to {len(filtered)} high-quality matches")
         return filtered
 
     def blast_and_filter(
@@ -158,52 +320,54 @@ class BLASTFilter:
             List of filtered hit dictionaries
         """
         # Run BLAST
-        blast_xml = self.run_blast_remote(sequence, database, program)
-        if not blast_xml:
+        result_handle = self.run_blast_remote(sequence, database, program)
+        if result_handle is None:
             return []
 
-        # Parse results
-        hits = self.parse_blast_results(blast_xml)
-
-        # Filter by thresholds
-        filtered_hits = self.filter_hits(hits)
+        # Parse and filter in one streaming pass
+        filtered_hits, _ = self.parse_filter_score(result_handle)
 
         return filtered_hits
 
     def batch_blast(
         self,
         sequences: List[Dict],
-        delay: float = 3.0
+        delay: float = 3.0,
+        max_workers: int = 3
     ) -> Dict[str, List[Dict]]:
         """
         Run BLAST for multiple sequences with rate limiting
 
+        Searches run concurrently; submissions are spaced by a shared
+        token bucket so at most one starts every `delay` seconds (and
+        never more often than BLAST_SUBMIT_INTERVAL allows).
+
         Args:
             sequences: List of sequence dictionaries with 'accession' and 'sequence'
-            delay: Delay between requests in seconds
+            delay: Minimum interval between submissions in seconds
+            max_workers: Number of concurrent BLAST searches
 
         Returns:
             Dictionary mapping accession to BLAST hits
         """
-        results = {}
-
-        for i, seq_data in enumerate(sequences):
-            accession = seq_data.get("accession", f"seq_{i}")
-            sequence = seq_data.get("sequence", "")
-
-            if not sequence:
-                continue
+        queries = [
+            (seq_data.get("accession", f"seq_{i}"), seq_data.get("sequence", ""))
+            for i, seq_data in enumerate(sequences)
+        ]
+        queries = [(accession, sequence) for accession, sequence in queries if sequence]
+        limiter = RateLimiter(rate=1.0 / delay) if delay > 0 else None
 
-            logger.info(f"BLASTing {accession} ({i+1}/{len(sequences)})...")
+        def run(indexed_query):
+            i, (accession, sequence) = indexed_query
+            if limiter is not None:
+                limiter.wait()
+            logger.info(f"BLASTing {accession} ({i+1}/{len(queries)})...")
+            return self.blast_and_filter(sequence)
 
-            hits = self.blast_and_filter(sequence)
-            results[accession] = hits
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            hits = list(executor.map(run, enumerate(queries)))
 
-            # Rate limiting
-            if i < len(sequences) - 1:
-                time.sleep(delay)
-
-        return results
+        return {accession: result for (accession, _), result in zip(queries, hits)}
 
     def calculate_homology_score(self, hits: List[Dict]) -> float:
         """
@@ -218,9 +382,18 @@ class BLASTFilter:
         if not hits:
             return 0.0
 
-        # Take best hit
-        best_hit = max(hits, key=lambda x: x["bitscore"])
+        # Take best hit (first one on ties, as max() would)
+        best_hit = hits[0]
+        best_bitscore = best_hit["bitscore"]
+        for hit in hits:
+            if hit["bitscore"] > best_bitscore:
+                best_bitscore = hit["bitscore"]
+                best_hit = hit
+
+        return self._score_hit(best_hit)
 
+    def _score_hit(self, best_hit: Dict) -> float:
+        """Homology score of a single (best) hit"""
         # Normalize scores
         identity_score = min(best_hit["identity"] / 100.0, 1.0)
         coverage_score = min(best_hit["coverage"] / 100.0, 1.0)
@@ -231,47 +404,109 @@ class BLASTFilter:
 
         return score
 
-    def annotate_with_blast(self, sequences: List[Dict]) -> List[Dict]:
+    def _apply_hits(
+        self,
+        seq_data: Dict,
+        hits: List[Dict],
+        homology_score: Optional[float] = None
+    ) -> Dict:
+        """Store BLAST hits on a sequence and fold the homology score into its confidence"""
+        # Calculate score
+        if homology_score is None:
+            homology_score = self.calculate_homology_score(hits)
+
+        # Add to sequence data
+        seq_data["blast_hits"] = hits
+        seq_data["blast_score"] = homology_score
+
+        # Update confidence score with BLAST data
+        if "confidence" in seq_data:
+            # Weighted combination of annotation and BLAST confidence
+            seq_data["confidence"] = (
+                seq_data["confidence"] * 0.6 +
+                homology_score * 0.4
+            )
+
+        return seq_data
+
+    def annotate_one(self, seq_data: Dict) -> Dict:
+        """
+        Add BLAST-based annotations to a single sequence
+
+        Args:
+            seq_data: Sequence dictionary
+
+        Returns:
+            The same sequence dictionary with BLAST data
+        """
+        sequence = seq_data.get("sequence", "")
+        if not sequence or len(sequence) < 50:
+            seq_data["blast_score"] = 0.0
+            seq_data["blast_hits"] = []
+            return seq_data
+
+        # Sequences unlike every known enzyme would find no passing hits;
+        # skip the remote search for them
+        if self.prefilter and self.prefilter.best_similarity(sequence) < self.prefilter_threshold:
+            return self._apply_hits(seq_data, [], 0.0)
+
+        # Run BLAST, then parse, filter and score in one pass
+        result_handle = self.run_blast_remote(sequence)
+        if result_handle is None:
+            return self._apply_hits(seq_data, [], 0.0)
+
+        hits, homology_score = self.parse_filter_score(result_handle)
+
+        return self._apply_hits(seq_data, hits, homology_score)
+
+    def annotate_with_blast(
+        self,
+        sequences: List[Dict],
+        max_workers: int = 3
+    ) -> List[Dict]:
         """
         Add BLAST-based annotations to sequences
 
+        With a local database the whole batch is searched in one DIAMOND
+        run; otherwise (or if the local run fails) remote BLAST is used.
+        Remote BLAST is network-bound, so sequences are searched
+        concurrently on a small thread pool.
+
         Args:
             sequences: List of sequence dictionaries
+            max_workers: Number of concurrent remote BLAST searches
 
         Returns:
             Annotated sequences with BLAST data
         """
-        for seq_data in sequences:
-            sequence = seq_data.get("sequence", "")
-            if not sequence or len(sequence) < 50:
-                seq_data["blast_score"] = 0.0
-                seq_data["blast_hits"] = []
-                continue
+        if self.local_db:
+            try:
+                return self._annotate_local(sequences)
+            except Exception as e:
+                logger.warning(f"Local BLAST failed ({e}), falling back to remote BLAST")
 
-            # Run BLAST
-            hits = self.blast_and_filter(sequence)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(self.annotate_one, sequences))
 
-            # Calculate score
-            homology_score = self.calculate_homology_score(hits)
+        return sequences
 
-            # Add to sequence data
-            seq_data["blast_hits"] = hits
-            seq_data["blast_score"] = homology_score
+    def _annotate_local(self, sequences: List[Dict]) -> List[Dict]:
+        """Annotate sequences from a single local DIAMOND run"""
+        searchable = [s for s in sequences if len(s.get("sequence", "")) >= 50]
+        hits_per_sequence = self.run_blast_local(searchable) if searchable else []
 
-            # Update confidence score with BLAST data
-            if "confidence" in seq_data:
-                # Weighted combination of annotation and BLAST confidence
-                seq_data["confidence"] = (
-                    seq_data["confidence"] * 0.6 +
-                    homology_score * 0.4
-                )
+        for seq_data in sequences:
+            seq_data["blast_score"] = 0.0
+            seq_data["blast_hits"] = []
+        for seq_data, hits in zip(searchable, hits_per_sequence):
+            self._apply_hits(seq_data, hits)
 
         return sequences
 
 
-def create_blast_filter() -> BLASTFilter:
+def create_blast_filter(use_cache: bool = True) -> BLASTFilter:
     """Factory function to create BLASTFilter instance"""
-    return BLASTFilter()
+    return BLASTFilter(use_cache=use_cache)
 
 
 if __name__ == "__main__":
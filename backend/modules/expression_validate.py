@@ -2,130 +2,184 @@
 Expression Validation Module
 Validates gut-specific expression of enzyme candidates
 """
-from typing import List, Dict, Optional, Set
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+from collections import Counter
+from functools import lru_cache
 import re
 import logging
 
-from ..config import GUT_TISSUES, DEVELOPMENTAL_STAGES
+from ..config import (
+    GUT_TISSUES, DEVELOPMENTAL_STAGES, GUT_TISSUE_PATTERN, DEV_STAGE_PATTERN
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Lowercased term lists, built once and shared by every validator
+_GUT_TISSUES = [tissue.lower() for tissue in GUT_TISSUES]
+_DEV_STAGES = [stage.lower() for stage in DEVELOPMENTAL_STAGES]
+
+# Tissue and stage fields come from a small vocabulary shared by many
+# sequences, so their classification is cached by (lowercased) value
+
+@lru_cache(maxsize=4096)
+def _classify_tissue(tissue: str) -> Optional[str]:
+    """Tissue type named by a lowercased tissue field, None if not gut"""
+    # Check for specific gut regions
+    if "midgut" in tissue:
+        return "midgut"
+    elif "foregut" in tissue:
+        return "foregut"
+    elif "hindgut" in tissue:
+        return "hindgut"
+    elif GUT_TISSUE_PATTERN.search(tissue):
+        return "gut"
+
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _classify_stage(stage: str) -> Optional[str]:
+    """Developmental stage named by a lowercased stage field"""
+    if "larva" in stage or "larval" in stage:
+        return "larval"
+    elif "adult" in stage:
+        return "adult"
+    elif "pupa" in stage or "pupal" in stage:
+        return "pupal"
+
+    return None
+
+
 class ExpressionValidator:
     """Validate tissue-specific expression of enzymes"""
 
     def __init__(self):
-        self.gut_tissues = [tissue.lower() for tissue in GUT_TISSUES]
-        self.dev_stages = [stage.lower() for stage in DEVELOPMENTAL_STAGES]
+        self.gut_tissues = _GUT_TISSUES
+        self.dev_stages = _DEV_STAGES
 
-    def is_gut_expressed(self, sequence_data: Dict) -> bool:
+    def _normalize(self, sequence_data: Dict) -> Dict[str, str]:
+        """
+        Lowercase the text fields the expression checks read, once per sequence
+
+        Args:
+            sequence_data: Sequence dictionary
+
+        Returns:
+            Dictionary of lowercased tissue, stage, description and search text
+        """
+        description = sequence_data.get("description", "").lower()
+        return {
+            "tissue": sequence_data.get("tissue", "").lower(),
+            "stage": sequence_data.get("stage", "").lower(),
+            "description": description,
+            "search_text": " ".join([
+                description,
+                sequence_data.get("protein_name", "").lower(),
+                str(sequence_data.get("keywords", [])).lower()
+            ])
+        }
+
+    def is_gut_expressed(self, sequence_data: Dict, norm: Optional[Dict] = None) -> bool:
         """
         Check if sequence is expressed in gut tissue
 
         Args:
             sequence_data: Sequence dictionary with metadata
+            norm: Precomputed _normalize() result
 
         Returns:
             True if gut-expressed
         """
-        # Check tissue field
-        tissue = sequence_data.get("tissue", "").lower()
-        for gut_tissue in self.gut_tissues:
-            if gut_tissue in tissue:
-                return True
-
-        # Check description and other text fields
-        search_text = " ".join([
-            sequence_data.get("description", ""),
-            sequence_data.get("protein_name", ""),
-            str(sequence_data.get("keywords", []))
-        ]).lower()
-
-        for gut_tissue in self.gut_tissues:
-            if gut_tissue in search_text:
-                return True
+        norm = norm or self._normalize(sequence_data)
 
-        return False
+        # Check tissue field, then description and other text fields
+        return bool(
+            _classify_tissue(norm["tissue"]) is not None
+            or GUT_TISSUE_PATTERN.search(norm["search_text"])
+        )
 
-    def get_tissue_type(self, sequence_data: Dict) -> Optional[str]:
+    def get_tissue_type(self, sequence_data: Dict, norm: Optional[Dict] = None) -> Optional[str]:
         """
         Extract specific tissue type
 
         Args:
             sequence_data: Sequence dictionary
+            norm: Precomputed _normalize() result
 
         Returns:
             Tissue type or None
         """
-        tissue = sequence_data.get("tissue", "").lower()
-
-        # Check for specific gut regions
-        if "midgut" in tissue:
-            return "midgut"
-        elif "foregut" in tissue:
-            return "foregut"
-        elif "hindgut" in tissue:
-            return "hindgut"
-        elif any(g in tissue for g in self.gut_tissues):
-            return "gut"
-
-        return None
+        return _classify_tissue((norm or self._normalize(sequence_data))["tissue"])
 
-    def get_developmental_stage(self, sequence_data: Dict) -> Optional[str]:
+    def get_developmental_stage(self, sequence_data: Dict, norm: Optional[Dict] = None) -> Optional[str]:
         """
         Extract developmental stage
 
         Args:
             sequence_data: Sequence dictionary
+            norm: Precomputed _normalize() result
 
         Returns:
             Developmental stage or None
         """
-        stage = sequence_data.get("stage", "").lower()
+        norm = norm or self._normalize(sequence_data)
+        stage = _classify_stage(norm["stage"])
+        if stage:
+            return stage
 
-        if "larva" in stage or "larval" in stage:
-            return "larval"
-        elif "adult" in stage:
-            return "adult"
-        elif "pupa" in stage or "pupal" in stage:
-            return "pupal"
+        # Check description (most mention no stage at all)
+        description = norm["description"]
+        if not DEV_STAGE_PATTERN.search(description):
+            return None
 
-        # Check description
-        description = sequence_data.get("description", "").lower()
         for dev_stage in self.dev_stages:
             if dev_stage in description:
                 return dev_stage
 
         return None
 
-    def calculate_expression_score(self, sequence_data: Dict) -> float:
+    def calculate_expression_score(self, sequence_data: Dict, norm: Optional[Dict] = None) -> float:
         """
         Calculate expression confidence score
 
         Args:
             sequence_data: Sequence dictionary
+            norm: Precomputed _normalize() result
 
         Returns:
             Expression score (0.0 to 1.0)
         """
+        norm = norm or self._normalize(sequence_data)
+        return self._expression_score(
+            self.is_gut_expressed(sequence_data, norm),
+            self.get_tissue_type(sequence_data, norm),
+            self.get_developmental_stage(sequence_data, norm)
+        )
+
+    def _expression_score(
+        self,
+        is_gut: bool,
+        tissue_type: Optional[str],
+        stage: Optional[str]
+    ) -> float:
+        """Combine the individual expression checks into a score"""
         score = 0.0
 
         # Gut tissue presence
-        if self.is_gut_expressed(sequence_data):
+        if is_gut:
             score += 0.4
 
             # Bonus for specific gut region
-            tissue_type = self.get_tissue_type(sequence_data)
             if tissue_type in ["midgut", "foregut", "hindgut"]:
                 score += 0.2
 
         # Developmental stage presence
-        if self.get_developmental_stage(sequence_data):
+        if stage:
             score += 0.2
 
         # Larval stage bonus (most relevant for wood digestion)
-        stage = self.get_developmental_stage(sequence_data)
         if stage == "larval":
             score += 0.2
 
@@ -141,11 +195,31 @@ class ExpressionValidator:
         Returns:
             Sequences with expression validation data
         """
+        for _ in self.validate_stream(sequences):
+            pass
+
+        logger.info(f"Validated expression for {len(sequences)} sequences")
+        return sequences
+
+    def validate_stream(self, sequences: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        Lazily validate expression one sequence at a time
+
+        Args:
+            sequences: Iterable of sequence dictionaries
+
+        Yields:
+            Sequences with expression validation data
+        """
         for seq in sequences:
-            seq["is_gut_expressed"] = self.is_gut_expressed(seq)
-            seq["tissue_type"] = self.get_tissue_type(seq)
-            seq["dev_stage_validated"] = self.get_developmental_stage(seq)
-            seq["expression_score"] = self.calculate_expression_score(seq)
+            # Each check runs once on text lowercased once
+            norm = self._normalize(seq)
+            seq["is_gut_expressed"] = self.is_gut_expressed(seq, norm)
+            seq["tissue_type"] = self.get_tissue_type(seq, norm)
+            seq["dev_stage_validated"] = self.get_developmental_stage(seq, norm)
+            seq["expression_score"] = self._expression_score(
+                seq["is_gut_expressed"], seq["tissue_type"], seq["dev_stage_validated"]
+            )
 
             # Update overall confidence with expression score
             if "confidence" in seq:
@@ -155,8 +229,7 @@ class ExpressionValidator:
                     seq["expression_score"] * 0.3
                 )
 
-        logger.info(f"Validated expression for {len(sequences)} sequences")
-        return sequences
+            yield seq
 
     def filter_gut_expressed(
         self,
@@ -203,27 +276,25 @@ class ExpressionValidator:
         stats = {
             "total": len(sequences),
             "gut_expressed": 0,
-            "tissue_distribution": {},
-            "stage_distribution": {},
+            "tissue_distribution": Counter(),
+            "stage_distribution": Counter(),
             "avg_expression_score": 0.0
         }
 
-        expression_scores = []
+        stats["tissue_distribution"].update(seq.get("tissue_type", "unknown") for seq in sequences)
+        stats["stage_distribution"].update(seq.get("dev_stage_validated", "unknown") for seq in sequences)
+
+        # Running total instead of a list of boxed scores
+        expression_sum = 0.0
 
         for seq in sequences:
             if seq.get("is_gut_expressed"):
                 stats["gut_expressed"] += 1
 
-            tissue = seq.get("tissue_type", "unknown")
-            stats["tissue_distribution"][tissue] = stats["tissue_distribution"].get(tissue, 0) + 1
-
-            stage = seq.get("dev_stage_validated", "unknown")
-            stats["stage_distribution"][stage] = stats["stage_distribution"].get(stage, 0) + 1
-
-            expression_scores.append(seq.get("expression_score", 0.0))
+            expression_sum += seq.get("expression_score", 0.0)
 
-        if expression_scores:
-            stats["avg_expression_score"] = sum(expression_scores) / len(expression_scores)
+        if sequences:
+            stats["avg_expression_score"] = expression_sum / len(sequences)
 
         return stats
 
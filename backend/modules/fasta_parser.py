@@ -0,0 +1,94 @@
+"""
+FASTA Parser Module
+Splits FASTA payloads into records with vectorized byte scans
+"""
+from typing import Iterator, List, Tuple
+import logging
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+NEWLINE = ord("\n")
+HEADER = ord(">")
+
+
+def fasta_offsets(data: bytes) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Locate records in a FASTA buffer without materializing any strings
+
+    Args:
+        data: Raw FASTA bytes
+
+    Returns:
+        Tuple of (header_starts, header_ends, record_ends) offset arrays.
+        A header spans data[start + 1:end]; its sequence lines span
+        data[end + 1:record_end].
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+    newlines = np.flatnonzero(buf == NEWLINE)
+
+    # Headers are lines starting with '>'
+    line_starts = np.concatenate(([0], newlines + 1))
+    line_starts = line_starts[line_starts < len(buf)]
+    header_starts = line_starts[buf[line_starts] == HEADER]
+
+    # Each header ends at the next newline, each record at the next header
+    next_newline = np.searchsorted(newlines, header_starts)
+    header_ends = np.append(newlines, len(buf))[next_newline]
+    record_ends = np.append(header_starts[1:], len(buf))
+
+    return header_starts, header_ends, record_ends
+
+
+def iter_fasta(data: bytes) -> Iterator[Tuple[str, str]]:
+    """
+    Iterate over records in a FASTA buffer
+
+    Args:
+        data: Raw FASTA bytes
+
+    Yields:
+        (header, sequence) tuples, header without the leading '>'
+    """
+    for start, header_end, record_end in zip(*fasta_offsets(data)):
+        header = data[start + 1:header_end].rstrip(b"\r")
+        sequence = data[header_end + 1:record_end].replace(b"\n", b"").replace(b"\r", b"")
+        yield header.decode("utf-8", "replace"), sequence.decode("ascii", "replace")
+
+
+def parse_fasta(data: bytes) -> List[Tuple[str, str]]:
+    """
+    Parse a FASTA buffer into records
+
+    Args:
+        data: Raw FASTA bytes
+
+    Returns:
+        List of (header, sequence) tuples
+    """
+    return list(iter_fasta(data))
+
+
+def read_fasta(input_file: str) -> List[Tuple[str, str]]:
+    """
+    Read a FASTA file into records
+
+    Args:
+        input_file: FASTA file path
+
+    Returns:
+        List of (header, sequence) tuples
+    """
+    with open(input_file, 'rb') as f:
+        records = parse_fasta(f.read())
+
+    logger.info(f"Read {len(records)} sequences from {input_file}")
+    return records
+
+
+if __name__ == "__main__":
+    # Test parser
+    sample = b">XP_1 cellulase\nMKLV\nAAGG\n>XP_2 laccase\r\nMSTQ\r\n"
+    for header, sequence in parse_fasta(sample):
+        print(f"{header}: {sequence}")
@@ -3,16 +3,94 @@ Digestive Matrix Builder Module
 Builds ranked enzyme matrix for wood digestion analysis
 """
 from typing import List, Dict, Optional
+import numpy as np
 import pandas as pd
+import csv
 import json
 import logging
-from collections import defaultdict
+import orjson
+from collections import Counter, defaultdict
 
-from ..config import ENZYME_KEYWORDS
+from ..config import CATEGORIES, ENZYME_KEYWORDS
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Biological function of each enzyme type; anything else degrades wood
+# polymers in general
+FUNCTION_MAP = {
+    "cellulase": "Cellulose hydrolysis",
+    "laccase": "Lignin oxidation",
+    "peroxidase": "Lignin degradation",
+    "oxidase": "Oxidative degradation",
+    "xylanase": "Hemicellulose breakdown",
+    "beta-glucosidase": "Cellulose hydrolysis",
+    "mannanase": "Hemicellulose breakdown"
+}
+DEFAULT_FUNCTION = "Wood polymer degradation"
+# Weights of the composite "overall" rank score
+RANK_SCORE_COLUMNS = ["Confidence", "Expression", "BLAST Score"]
+RANK_SCORE_WEIGHTS = np.array([0.5, 0.3, 0.2])
+
+# One entry of the report's top candidates section
+TOP_ENZYME_TEMPLATE = (
+    "\n{0} - {1}\n"
+    "  Protein: {2}\n"
+    "  Organism: {3}\n"
+    "  Tissue: {4} | Stage: {5}\n"
+    "  EC: {6} | GH Family: {7}\n"
+    "  Confidence: {8:.3f} | Expression: {9:.3f}\n"
+    "  Function: {10}\n"
+)
+
+# Matrix columns stored as pandas categoricals
+CATEGORICAL_COLUMNS = ["Enzyme", "GH/AA Family", "Organism", "Tissue", "Stage"]
+
+# Function lookup by categorical code; code -1 (not a mapped enzyme type)
+# picks the trailing default
+_FUNCTION_CATEGORIES = list(FUNCTION_MAP)
+_FUNCTION_LOOKUP = np.array(list(FUNCTION_MAP.values()) + [DEFAULT_FUNCTION], dtype=object)
+
+# Functional cluster of each enzyme type; anything else is "Other"
+ENZYME_CLUSTER_MAP = {
+    "cellulase": "Cellulose Degradation",
+    "beta-glucosidase": "Cellulose Degradation",
+    "laccase": "Lignin Degradation",
+    "peroxidase": "Lignin Degradation",
+    "xylanase": "Hemicellulose Degradation",
+    "mannanase": "Hemicellulose Degradation",
+    "oxidase": "Oxidative Enzymes"
+}
+
+
+def _value_counts(column: pd.Series) -> Dict:
+    """
+    Count each value present in a column
+
+    Categorical columns are counted with a bincount over their codes,
+    anything else with a Counter over the raw values; both skip missing
+    values and values with no rows.
+
+    Args:
+        column: Matrix column
+
+    Returns:
+        Dictionary of value counts, most common first (ties in order of
+        first appearance)
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        # Ties are broken by each code's first row, since categories follow
+        # the configured vocabulary rather than row order
+        codes = column.cat.codes.to_numpy()
+        present, first = np.unique(codes, return_index=True)
+        keep = present >= 0
+        present, first = present[keep], first[keep]
+        counts = np.bincount(codes[codes >= 0], minlength=len(column.cat.categories))[present]
+        categories = column.cat.categories[present]
+        return {categories[i]: int(counts[i]) for i in np.lexsort((first, -counts))}
+
+    return dict(Counter(column.dropna().to_numpy()).most_common())
+
 
 class DigestiveMatrixBuilder:
     """Build comprehensive digestive enzyme matrix"""
@@ -23,7 +101,8 @@ class DigestiveMatrixBuilder:
     def build_matrix(
         self,
         sequences: List[Dict],
-        min_confidence: float = 0.5
+        min_confidence: float = 0.5,
+        top_k: Optional[int] = None
     ) -> pd.DataFrame:
         """
         Build digestive enzyme matrix from sequences
@@ -31,62 +110,63 @@ class DigestiveMatrixBuilder:
         Args:
             sequences: List of annotated sequence dictionaries
             min_confidence: Minimum confidence threshold
+            top_k: Only keep the k most confident enzymes
 
         Returns:
             DataFrame with enzyme matrix
         """
-        # Filter by confidence
-        filtered = [s for s in sequences if s.get("confidence", 0) >= min_confidence]
+        # Filter by confidence with one vectorized comparison
+        confidences = np.fromiter(
+            (s.get("confidence", 0) for s in sequences),
+            dtype=np.float64,
+            count=len(sequences)
+        )
+        filtered = [sequences[i] for i in np.flatnonzero(confidences >= min_confidence)]
 
         logger.info(f"Building matrix from {len(filtered)} high-confidence sequences")
 
-        matrix_data = []
-
-        for seq in filtered:
-            row = {
-                "Enzyme": seq.get("enzyme_type", "unknown"),
-                "EC": seq.get("ec_number_annotated", ""),
-                "GH/AA Family": seq.get("gh_family", ""),
-                "Gene ID": seq.get("accession", ""),
-                "Gene Name": seq.get("gene_name", ""),
-                "Protein": seq.get("protein_name", ""),
-                "Organism": seq.get("organism", ""),
-                "Tissue": seq.get("tissue_type", seq.get("tissue", "")),
-                "Stage": seq.get("dev_stage_validated", seq.get("stage", "")),
-                "Length": seq.get("length", 0),
-                "Confidence": round(seq.get("confidence", 0.0), 3),
-                "Expression": round(seq.get("expression_score", 0.0), 3),
-                "BLAST Score": round(seq.get("blast_score", 0.0), 3),
-                "Function": self._infer_function(seq)
-            }
-
-            matrix_data.append(row)
-
-        # Create DataFrame
-        df = pd.DataFrame(matrix_data)
-
-        # Sort by confidence
-        df = df.sort_values("Confidence", ascending=False)
+        # Build the matrix column by column rather than as a list of row dicts
+        df = pd.DataFrame({
+            "Enzyme": [s.get("enzyme_type", "unknown") for s in filtered],
+            "EC": [s.get("ec_number_annotated", "") for s in filtered],
+            "GH/AA Family": [s.get("gh_family", "") for s in filtered],
+            "Gene ID": [s.get("accession", "") for s in filtered],
+            "Gene Name": [s.get("gene_name", "") for s in filtered],
+            "Protein": [s.get("protein_name", "") for s in filtered],
+            "Organism": [s.get("organism", "") for s in filtered],
+            "Tissue": [s.get("tissue_type", s.get("tissue", "")) for s in filtered],
+            "Stage": [s.get("dev_stage_validated", s.get("stage", "")) for s in filtered],
+            "Length": [s.get("length", 0) for s in filtered],
+            "Confidence": [s.get("confidence", 0.0) for s in filtered],
+            "Expression": [s.get("expression_score", 0.0) for s in filtered],
+            "BLAST Score": [s.get("blast_score", 0.0) for s in filtered]
+        })
+
+        # Round and derive the function column by column
+        score_columns = ["Confidence", "Expression", "BLAST Score"]
+        df[score_columns] = df[score_columns].round(3)
+        enzyme_codes = pd.Categorical(df["Enzyme"], categories=_FUNCTION_CATEGORIES).codes
+        df["Function"] = _FUNCTION_LOOKUP[enzyme_codes]
+
+        # Low-cardinality labels as categoricals, so counting, grouping and
+        # substring checks work on a handful of categories instead of every
+        # row. Columns with a configured vocabulary start from it, so their
+        # codes are the same in every matrix; values outside it are
+        # appended in first-appearance order rather than dropped.
+        for col in CATEGORICAL_COLUMNS:
+            vocabulary = pd.Index(CATEGORIES.get(col, []), dtype=object)
+            observed = pd.Index(df[col].dropna().unique(), dtype=object)
+            categories = vocabulary.append(observed[~observed.isin(vocabulary)])
+            df[col] = pd.Categorical(df[col], categories=categories)
+
+        # Sort by confidence (a partial selection when only the top is kept)
+        if top_k is not None:
+            df = df.nlargest(top_k, "Confidence")
+        else:
+            df = df.sort_values("Confidence", ascending=False)
 
         return df
 
-    def _infer_function(self, sequence: Dict) -> str:
-        """Infer enzyme function from metadata"""
-        enzyme_type = sequence.get("enzyme_type", "")
-        ec = sequence.get("ec_number_annotated", "")
-
-        function_map = {
-            "cellulase": "Cellulose hydrolysis",
-            "laccase": "Lignin oxidation",
-            "peroxidase": "Lignin degradation",
-            "oxidase": "Oxidative degradation",
-            "xylanase": "Hemicellulose breakdown",
-            "beta-glucosidase": "Cellulose hydrolysis",
-            "mannanase": "Hemicellulose breakdown"
-        }
-
-        return function_map.get(enzyme_type, "Wood polymer degradation")
-
     def generate_summary(self, matrix_df: pd.DataFrame) -> Dict:
         """
         Generate summary statistics from matrix
@@ -97,18 +177,20 @@ class DigestiveMatrixBuilder:
         Returns:
             Summary statistics dictionary
         """
+        # Count with boolean masks instead of slicing out sub-frames
+        gh_families = matrix_df["GH/AA Family"]
         summary = {
             "total_enzymes": len(matrix_df),
             "unique_enzyme_types": matrix_df["Enzyme"].nunique(),
-            "enzyme_distribution": matrix_df["Enzyme"].value_counts().to_dict(),
-            "organism_distribution": matrix_df["Organism"].value_counts().to_dict(),
-            "tissue_distribution": matrix_df["Tissue"].value_counts().to_dict(),
-            "stage_distribution": matrix_df["Stage"].value_counts().to_dict(),
-            "gh_family_distribution": matrix_df[matrix_df["GH/AA Family"] != ""]["GH/AA Family"].value_counts().to_dict(),
+            "enzyme_distribution": _value_counts(matrix_df["Enzyme"]),
+            "organism_distribution": _value_counts(matrix_df["Organism"]),
+            "tissue_distribution": _value_counts(matrix_df["Tissue"]),
+            "stage_distribution": _value_counts(matrix_df["Stage"]),
+            "gh_family_distribution": _value_counts(gh_families[gh_families != ""]),
             "avg_confidence": matrix_df["Confidence"].mean(),
-            "high_confidence_count": len(matrix_df[matrix_df["Confidence"] >= 0.8]),
-            "gut_expressed_count": len(matrix_df[matrix_df["Tissue"].str.contains("gut", na=False)]),
-            "larval_stage_count": len(matrix_df[matrix_df["Stage"].str.contains("larval", na=False)])
+            "high_confidence_count": int((matrix_df["Confidence"] >= 0.8).sum()),
+            "gut_expressed_count": int(matrix_df["Tissue"].str.contains("gut", case=False, na=False, regex=False).sum()),
+            "larval_stage_count": int(matrix_df["Stage"].str.contains("larval", case=False, na=False, regex=False).sum())
         }
 
         return summary
@@ -131,20 +213,11 @@ class DigestiveMatrixBuilder:
             "Other": []
         }
 
-        for _, row in matrix_df.iterrows():
-            enzyme = row["Enzyme"]
-            gene_id = row["Gene ID"]
-
-            if enzyme in ["cellulase", "beta-glucosidase"]:
-                clusters["Cellulose Degradation"].append(gene_id)
-            elif enzyme in ["laccase", "peroxidase"]:
-                clusters["Lignin Degradation"].append(gene_id)
-            elif enzyme in ["xylanase", "mannanase"]:
-                clusters["Hemicellulose Degradation"].append(gene_id)
-            elif enzyme in ["oxidase"]:
-                clusters["Oxidative Enzymes"].append(gene_id)
-            else:
-                clusters["Other"].append(gene_id)
+        # Map every row to its cluster at once, then collect gene IDs per
+        # cluster (rows keep their order within each group)
+        cluster_col = matrix_df["Enzyme"].astype(object).map(ENZYME_CLUSTER_MAP).fillna("Other")
+        grouped = matrix_df["Gene ID"].groupby(cluster_col, sort=False).apply(list)
+        clusters.update(grouped.to_dict())
 
         return clusters
 
@@ -164,13 +237,11 @@ class DigestiveMatrixBuilder:
             Ranked DataFrame
         """
         if criteria == "overall":
-            # Composite score
-            matrix_df["Rank Score"] = (
-                matrix_df["Confidence"] * 0.5 +
-                matrix_df["Expression"] * 0.3 +
-                matrix_df["BLAST Score"] * 0.2
-            )
-            return matrix_df.sort_values("Rank Score", ascending=False)
+            # Composite score as one matrix-vector product; the caller's
+            # frame is left untouched
+            scores = matrix_df[RANK_SCORE_COLUMNS].to_numpy(dtype=np.float64) @ RANK_SCORE_WEIGHTS
+            order = np.argsort(-scores, kind="stable")
+            return matrix_df.assign(**{"Rank Score": scores}).iloc[order]
 
         elif criteria == "confidence":
             return matrix_df.sort_values("Confidence", ascending=False)
@@ -187,20 +258,36 @@ class DigestiveMatrixBuilder:
         self,
         matrix_df: pd.DataFrame,
         output_file: str,
-        format: str = "csv"
+        format: str = "csv",
+        fast: bool = True,
+        parquet_compression: str = "zstd"
     ):
         """
         Export matrix to file
 
+        Parquet output (and load_matrix) requires pyarrow.
+
         Args:
             matrix_df: Enzyme matrix DataFrame
             output_file: Output file path
-            format: Output format (csv, json, excel)
+            format: Output format (csv, json, parquet, excel)
+            fast: Write CSV directly with the csv module instead of to_csv
+            parquet_compression: Parquet codec; zstd for smaller files,
+                lz4 for faster writes and reloads
         """
-        if format == "csv":
+        if format == "csv" and fast:
+            self._write_csv(matrix_df, output_file)
+        elif format == "csv":
             matrix_df.to_csv(output_file, index=False)
         elif format == "json":
-            matrix_df.to_json(output_file, orient="records", indent=2)
+            records = matrix_df.to_dict(orient="records")
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(
+                    records,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+                ))
+        elif format == "parquet":
+            matrix_df.to_parquet(output_file, engine="pyarrow", compression=parquet_compression, index=False)
         elif format == "excel":
             matrix_df.to_excel(output_file, index=False)
         else:
@@ -208,10 +295,50 @@ class DigestiveMatrixBuilder:
 
         logger.info(f"Exported matrix to {output_file}")
 
+    def _write_csv(self, matrix_df: pd.DataFrame, output_file: str):
+        """
+        Write the matrix as CSV, byte-for-byte what to_csv(index=False) writes
+
+        Columns are pulled out whole and their rows handed to the C csv
+        writer in one call, skipping pandas' per-chunk cell formatting.
+        Floats format as their repr either way; missing values become
+        empty fields like to_csv's default na_rep.
+
+        Args:
+            matrix_df: Enzyme matrix DataFrame
+            output_file: Output CSV path
+        """
+        columns = []
+        for name in matrix_df.columns:
+            col = matrix_df[name]
+            if col.hasnans:
+                col = col.astype(object).where(col.notna(), "")
+            columns.append(col.tolist())
+
+        with open(output_file, 'w', newline='', buffering=1 << 20) as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(matrix_df.columns)
+            writer.writerows(zip(*columns))
+
+    def load_matrix(self, input_file: str) -> pd.DataFrame:
+        """
+        Load a matrix previously exported as Parquet
+
+        Args:
+            input_file: Parquet file path
+
+        Returns:
+            DataFrame with enzyme matrix
+        """
+        matrix_df = pd.read_parquet(input_file, engine="pyarrow")
+        logger.info(f"Loaded matrix from {input_file}")
+        return matrix_df
+
     def generate_report(
         self,
         matrix_df: pd.DataFrame,
-        output_file: str
+        output_file: str,
+        summary: Optional[Dict] = None
     ):
         """
         Generate comprehensive text report
@@ -219,64 +346,75 @@ class DigestiveMatrixBuilder:
         Args:
             matrix_df: Enzyme matrix DataFrame
             output_file: Output text file path
+            summary: Summary of matrix_df from generate_summary, if the
+                caller already has it
         """
-        summary = self.generate_summary(matrix_df)
+        if summary is None:
+            summary = self.generate_summary(matrix_df)
         clusters = self.identify_enzyme_clusters(matrix_df)
 
+        # Assemble the report in memory and write it in one call
+        parts = []
+        write = parts.append
+
+        write("=" * 80 + "\n")
+        write("EMERALD ASH BORER DIGESTIVE ENZYME DISCOVERY REPORT\n")
+        write("=" * 80 + "\n\n")
+
+        write("SUMMARY STATISTICS\n")
+        write("-" * 80 + "\n")
+        write(f"Total Enzymes Identified: {summary['total_enzymes']}\n")
+        write(f"Unique Enzyme Types: {summary['unique_enzyme_types']}\n")
+        write(f"Average Confidence: {summary['avg_confidence']:.2f}\n")
+        write(f"High Confidence (≥0.8): {summary['high_confidence_count']}\n")
+        write(f"Gut-Expressed: {summary['gut_expressed_count']}\n")
+        write(f"Larval Stage: {summary['larval_stage_count']}\n\n")
+
+        write("ENZYME TYPE DISTRIBUTION\n")
+        write("-" * 80 + "\n")
+        for enzyme, count in summary['enzyme_distribution'].items():
+            write(f"  {enzyme}: {count}\n")
+        write("\n")
+
+        write("ORGANISM DISTRIBUTION\n")
+        write("-" * 80 + "\n")
+        for org, count in summary['organism_distribution'].items():
+            write(f"  {org}: {count}\n")
+        write("\n")
+
+        write("GH/AA FAMILY DISTRIBUTION\n")
+        write("-" * 80 + "\n")
+        for family, count in summary.get('gh_family_distribution', {}).items():
+            write(f"  {family}: {count}\n")
+        write("\n")
+
+        write("FUNCTIONAL ENZYME CLUSTERS\n")
+        write("-" * 80 + "\n")
+        for cluster_name, gene_ids in clusters.items():
+            write(f"\n{cluster_name} ({len(gene_ids)} enzymes):\n")
+            for gene_id in gene_ids[:10]:  # Show top 10
+                write(f"  - {gene_id}\n")
+            if len(gene_ids) > 10:
+                write(f"  ... and {len(gene_ids) - 10} more\n")
+
+        write("\n" + "=" * 80 + "\n")
+        write("TOP 20 CANDIDATE ENZYMES (by confidence)\n")
+        write("=" * 80 + "\n\n")
+
+        # Partial selection of the top rows, then one template per row
+        top_enzymes = matrix_df.nlargest(20, "Confidence")[[
+            "Gene ID", "Enzyme", "Protein", "Organism", "Tissue", "Stage",
+            "EC", "GH/AA Family", "Confidence", "Expression", "Function"
+        ]]
+        # Missing categorical labels come back as NaN; print them as None
+        top_enzymes = top_enzymes.astype(object).where(top_enzymes.notna(), None)
+        parts.extend(
+            TOP_ENZYME_TEMPLATE.format(*row)
+            for row in top_enzymes.itertuples(index=False, name=None)
+        )
+
         with open(output_file, 'w') as f:
-            f.write("=" * 80 + "\n")
-            f.write("EMERALD ASH BORER DIGESTIVE ENZYME DISCOVERY REPORT\n")
-            f.write("=" * 80 + "\n\n")
-
-            f.write("SUMMARY STATISTICS\n")
-            f.write("-" * 80 + "\n")
-            f.write(f"Total Enzymes Identified: {summary['total_enzymes']}\n")
-            f.write(f"Unique Enzyme Types: {summary['unique_enzyme_types']}\n")
-            f.write(f"Average Confidence: {summary['avg_confidence']:.2f}\n")
-            f.write(f"High Confidence (≥0.8): {summary['high_confidence_count']}\n")
-            f.write(f"Gut-Expressed: {summary['gut_expressed_count']}\n")
-            f.write(f"Larval Stage: {summary['larval_stage_count']}\n\n")
-
-            f.write("ENZYME TYPE DISTRIBUTION\n")
-            f.write("-" * 80 + "\n")
-            for enzyme, count in summary['enzyme_distribution'].items():
-                f.write(f"  {enzyme}: {count}\n")
-            f.write("\n")
-
-            f.write("ORGANISM DISTRIBUTION\n")
-            f.write("-" * 80 + "\n")
-            for org, count in summary['organism_distribution'].items():
-                f.write(f"  {org}: {count}\n")
-            f.write("\n")
-
-            f.write("GH/AA FAMILY DISTRIBUTION\n")
-            f.write("-" * 80 + "\n")
-            for family, count in summary.get('gh_family_distribution', {}).items():
-                f.write(f"  {family}: {count}\n")
-            f.write("\n")
-
-            f.write("FUNCTIONAL ENZYME CLUSTERS\n")
-            f.write("-" * 80 + "\n")
-            for cluster_name, gene_ids in clusters.items():
-                f.write(f"\n{cluster_name} ({len(gene_ids)} enzymes):\n")
-                for gene_id in gene_ids[:10]:  # Show top 10
-                    f.write(f"  - {gene_id}\n")
-                if len(gene_ids) > 10:
-                    f.write(f"  ... and {len(gene_ids) - 10} more\n")
-
-            f.write("\n" + "=" * 80 + "\n")
-            f.write("TOP 20 CANDIDATE ENZYMES (by confidence)\n")
-            f.write("=" * 80 + "\n\n")
-
-            top_enzymes = matrix_df.head(20)
-            for idx, row in top_enzymes.iterrows():
-                f.write(f"\n{row['Gene ID']} - {row['Enzyme']}\n")
-                f.write(f"  Protein: {row['Protein']}\n")
-                f.write(f"  Organism: {row['Organism']}\n")
-                f.write(f"  Tissue: {row['Tissue']} | Stage: {row['Stage']}\n")
-                f.write(f"  EC: {row['EC']} | GH Family: {row['GH/AA Family']}\n")
-                f.write(f"  Confidence: {row['Confidence']:.3f} | Expression: {row['Expression']:.3f}\n")
-                f.write(f"  Function: {row['Function']}\n")
+            f.write("".join(parts))
 
         logger.info(f"Generated report at {output_file}")
 
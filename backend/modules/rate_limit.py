@@ -0,0 +1,57 @@
+"""
+Rate Limiting Module
+Token bucket shared by threads and coroutines to stay within NCBI
+E-utilities limits
+"""
+import asyncio
+import threading
+import time
+
+
+class RateLimiter:
+    """Token bucket shared by concurrent NCBI requests"""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        Args:
+            rate: Tokens added per second (requests per second)
+            capacity: Maximum number of tokens that can accumulate
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take a token from the bucket
+
+        Returns:
+            Seconds the caller must wait before issuing its request
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def wait(self):
+        """Block until the caller is allowed to issue a request"""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire(self):
+        """
+        Wait on the event loop until the caller may issue a request
+
+        Shares the same bucket as wait(), so threads and coroutines can
+        draw from one limiter, and works under any event loop.
+        """
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
@@ -2,47 +2,123 @@
 Sequence Retrieval Module
 Handles downloading and parsing sequences from NCBI
 """
-import time
-from typing import List, Dict, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from io import BufferedReader, BytesIO, TextIOWrapper
+from typing import List, Dict, Iterator, Optional, TextIO, Tuple
 from Bio import Entrez, SeqIO
 from Bio.SeqRecord import SeqRecord
 import logging
 import json
+import re
+import sqlite3
+import threading
+import orjson
 from pathlib import Path
 
 from ..config import (
-    NCBI_EMAIL, NCBI_API_KEY, NCBI_TOOL, NCBI_RATE_LIMIT,
-    CACHE_DIR
+    NCBI_RATE_LIMIT, NCBI_MAX_RPS, CACHE_DIR, ensure_dirs, eutils_request, get_ncbi_session
 )
-
-Entrez.email = NCBI_EMAIL
-Entrez.tool = NCBI_TOOL
-if NCBI_API_KEY:
-    Entrez.api_key = NCBI_API_KEY
+from .rate_limit import RateLimiter
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Inserts a newline after every 60 residues of a FASTA sequence
+_FASTA_WRAP_RE = re.compile(r"(.{60})")
+# Error message of an E-utilities response that failed with HTTP 200
+_EUTILS_ERROR_RE = re.compile(rb"<ERROR>(.*?)</ERROR>", re.DOTALL)
+
+
+class HistoryExpiredError(RuntimeError):
+    """NCBI rejected a WebEnv/QueryKey history handle (expired or invalid)"""
+
 
 class SequenceRetriever:
     """Retrieve and parse sequences from NCBI"""
 
-    def __init__(self, rate_limit: float = NCBI_RATE_LIMIT, use_cache: bool = True):
+    def __init__(
+        self,
+        rate_limit: float = NCBI_RATE_LIMIT,
+        use_cache: bool = True,
+        max_workers: int = NCBI_MAX_RPS,
+        session=None,
+        memory_cache_size: int = 8192
+    ):
         self.rate_limit = rate_limit
-        self.last_request_time = 0
+        self.session = session if session is not None else get_ncbi_session()
+        self.limiter = RateLimiter(rate=1.0 / rate_limit)
+        self.max_workers = max_workers
         self.use_cache = use_cache
         self.cache_dir = Path(CACHE_DIR)
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._cache_db = None
+        self._cache_lock = threading.Lock()
+        # Recently used parsed sequences, in front of the SQLite store
+        self._mem_cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self.memory_cache_size = memory_cache_size
+        if use_cache:
+            ensure_dirs(CACHE_DIR)
+            self._cache_db = self._open_cache_db()
+
+    def _open_cache_db(self) -> sqlite3.Connection:
+        """Open the key-value store holding parsed sequences"""
+        # Shared by the fetch threads; writes are serialized by _cache_lock
+        conn = sqlite3.connect(
+            self.cache_dir / "sequences.sqlite",
+            isolation_level=None,
+            check_same_thread=False
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS seqcache (key TEXT PRIMARY KEY, data BLOB)")
+        return conn
 
     def _rate_limit_wait(self):
-        """Ensure compliance with NCBI rate limits"""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.rate_limit:
-            time.sleep(self.rate_limit - elapsed)
-        self.last_request_time = time.time()
+        """Ensure compliance with NCBI rate limits (safe across threads)"""
+        self.limiter.wait()
+
+    def _eutils_get(self, endpoint: str, **params) -> bytes:
+        """
+        Call an E-utilities endpoint over the shared HTTP session
+
+        Args:
+            endpoint: E-utilities endpoint (e.g., 'efetch.fcgi')
+            params: Query parameters
+
+        Returns:
+            Raw response body
+        """
+        return eutils_request(self.session, endpoint, params).content
+
+    @contextmanager
+    def _eutils_stream(self, endpoint: str, **params) -> Iterator[TextIO]:
+        """
+        Stream an E-utilities response as text, for parsers that read
+        incrementally
+
+        Args:
+            endpoint: E-utilities endpoint (e.g., 'efetch.fcgi')
+            params: Query parameters
+
+        Yields:
+            Text handle over the response body
+        """
+        response = eutils_request(self.session, endpoint, params, stream=True)
+        try:
+            raw = response.raw
+            raw.decode_content = True
+            # The text layer reads past the end once; keep the raw stream
+            # open until response.close() so that read returns b"" rather
+            # than failing on a closed file
+            raw.auto_close = False
+            # Buffered, so callers can peek at the start of the body
+            yield TextIOWrapper(BufferedReader(raw), encoding="utf-8")
+        finally:
+            response.close()
 
     def _get_cache_path(self, database: str, acc_id: str) -> Path:
-        """Get cache file path for an accession"""
+        """Get the legacy per-accession JSON cache file path"""
         return self.cache_dir / f"{database}_{acc_id}.json"
 
     def _load_from_cache(self, database: str, acc_id: str) -> Optional[Dict]:
@@ -50,11 +126,36 @@ class SequenceRetriever:
         if not self.use_cache:
             return None
 
+        key = f"{database}_{acc_id}"
+        with self._cache_lock:
+            data = self._mem_cache.get(key)
+            if data is not None:
+                self._mem_cache.move_to_end(key)
+        # Copies keep callers' edits out of the cached entry
+        if data is not None:
+            return dict(data)
+
+        try:
+            with self._cache_lock:
+                row = self._cache_db.execute(
+                    "SELECT data FROM seqcache WHERE key = ?", (key,)
+                ).fetchone()
+            if row:
+                data = orjson.loads(row[0])
+                self._remember(key, data)
+                return dict(data)
+        except Exception as e:
+            logger.warning(f"Error loading cache for {acc_id}: {e}")
+            return None
+
+        # Entries cached before the key-value store moved over on first use
         cache_path = self._get_cache_path(database, acc_id)
         if cache_path.exists():
             try:
                 with open(cache_path, 'r') as f:
-                    return json.load(f)
+                    data = json.load(f)
+                self._save_to_cache(database, acc_id, data)
+                return data
             except Exception as e:
                 logger.warning(f"Error loading cache for {acc_id}: {e}")
         return None
@@ -64,13 +165,26 @@ class SequenceRetriever:
         if not self.use_cache:
             return
 
-        cache_path = self._get_cache_path(database, acc_id)
+        key = f"{database}_{acc_id}"
+        self._remember(key, dict(data))
         try:
-            with open(cache_path, 'w') as f:
-                json.dump(data, f, indent=2)
+            payload = orjson.dumps(data)
+            with self._cache_lock:
+                self._cache_db.execute(
+                    "INSERT OR REPLACE INTO seqcache (key, data) VALUES (?, ?)",
+                    (key, payload)
+                )
         except Exception as e:
             logger.warning(f"Error saving cache for {acc_id}: {e}")
 
+    def _remember(self, key: str, data: Dict):
+        """Add an entry to the in-memory LRU cache, evicting the oldest"""
+        with self._cache_lock:
+            self._mem_cache[key] = data
+            self._mem_cache.move_to_end(key)
+            while len(self._mem_cache) > self.memory_cache_size:
+                self._mem_cache.popitem(last=False)
+
     def fetch_sequence(
         self,
         database: str,
@@ -95,21 +209,144 @@ class SequenceRetriever:
         try:
             logger.debug(f"Fetching {acc_id} from {database}")
 
-            handle = Entrez.efetch(
+            content = self._eutils_get(
+                "efetch.fcgi",
                 db=database,
                 id=acc_id,
                 rettype=rettype,
                 retmode=retmode
             )
-            data = handle.read()
-            handle.close()
 
-            return data
+            return content.decode("utf-8")
 
         except Exception as e:
             logger.error(f"Error fetching {acc_id}: {e}")
             return None
 
+    def fetch_genbank_batch(self, database: str, id_list: List[str]) -> Dict[str, Dict]:
+        """
+        Fetch and parse GenBank records for many IDs in one efetch request
+
+        Records are matched to the requested IDs by accession, versioned
+        accession or GI number. When NCBI returns exactly one record per ID
+        the rest are matched by position (efetch keeps request order).
+
+        Args:
+            database: Database name (protein, nucleotide, etc.)
+            id_list: Accession IDs or UIDs
+
+        Returns:
+            Dictionary mapping requested ID to parsed sequence data; IDs
+            that could not be matched are left out
+        """
+        if not id_list:
+            return {}
+
+        self._rate_limit_wait()
+
+        try:
+            # Records are parsed as the response streams in
+            with self._eutils_stream(
+                "efetch.fcgi",
+                db=database,
+                id=",".join(id_list),
+                rettype="gb",
+                retmode="text"
+            ) as handle:
+                records = [
+                    (record, self.parse_genbank_record(record))
+                    for record in SeqIO.parse(handle, "genbank")
+                ]
+        except Exception as e:
+            logger.error(f"Error fetching GenBank batch: {e}")
+            return {}
+
+        wanted = set(id_list)
+        matched = {}
+        for record, parsed_data in records:
+            keys = [record.id, record.id.split(".")[0], record.name, str(record.annotations.get("gi", ""))]
+            for key in keys:
+                if key in wanted and key not in matched:
+                    matched[key] = parsed_data
+
+        if len(records) == len(id_list):
+            for acc_id, (_, parsed_data) in zip(id_list, records):
+                matched.setdefault(acc_id, parsed_data)
+
+        results = {}
+        for acc_id, parsed_data in matched.items():
+            # Add source metadata
+            parsed_data = dict(parsed_data, source_database=database, accession_id=acc_id)
+            self._save_to_cache(database, acc_id, parsed_data)
+            results[acc_id] = parsed_data
+
+        return results
+
+    def fetch_genbank_history(
+        self,
+        database: str,
+        webenv: str,
+        query_key: str,
+        retmax: int,
+        retstart: int = 0
+    ) -> List[Dict]:
+        """
+        Fetch and parse GenBank records of a search stored on NCBI's history server
+
+        Pairs with NCBISearcher.search_database(..., fetch_ids=False): the
+        records are addressed by WebEnv/QueryKey instead of an ID list.
+
+        Args:
+            database: Database name (protein, nucleotide, etc.)
+            webenv: WebEnv returned by the search
+            query_key: QueryKey returned by the search
+            retmax: Number of records to fetch
+            retstart: Index of the first record
+
+        Returns:
+            List of parsed sequence data, in search order
+
+        Raises:
+            HistoryExpiredError: NCBI no longer holds the search; run it
+                again for a fresh WebEnv
+            requests.HTTPError: On an error status
+        """
+        self._rate_limit_wait()
+
+        with self._eutils_stream(
+            "efetch.fcgi",
+            db=database,
+            WebEnv=webenv,
+            query_key=query_key,
+            retstart=retstart,
+            retmax=retmax,
+            rettype="gb",
+            retmode="text"
+        ) as handle:
+            # An unknown or expired WebEnv still answers 200, with an
+            # XML error document in place of the records
+            error = _EUTILS_ERROR_RE.search(handle.buffer.peek(4096))
+            if error:
+                raise HistoryExpiredError(
+                    f"Cannot fetch {database} records from history: {error.group(1).decode().strip()}"
+                )
+
+            results = []
+            for record in SeqIO.parse(handle, "genbank"):
+                parsed_data = dict(
+                    self.parse_genbank_record(record),
+                    source_database=database,
+                    accession_id=record.id
+                )
+                # retrieve_batch looks records up by the IDs it is given,
+                # which may be unversioned accessions or GI numbers
+                for acc_id in {record.id, record.id.split(".")[0], str(record.annotations.get("gi", ""))}:
+                    if acc_id:
+                        self._save_to_cache(database, acc_id, parsed_data)
+                results.append(parsed_data)
+
+        return results
+
     def parse_genbank_record(self, record: SeqRecord) -> Dict:
         """
         Parse a GenBank SeqRecord into structured data
@@ -203,29 +440,12 @@ class SequenceRetriever:
             logger.debug(f"Loaded {acc_id} from cache")
             return cached_data
 
-        # Fetch from NCBI
-        gb_data = self.fetch_sequence(database, acc_id, rettype="gb")
-        if not gb_data:
-            return None
-
-        try:
-            # Parse GenBank format
-            from io import StringIO
-            record = SeqIO.read(StringIO(gb_data), "genbank")
-            parsed_data = self.parse_genbank_record(record)
-
-            # Add source metadata
-            parsed_data["source_database"] = database
-            parsed_data["accession_id"] = acc_id
-
-            # Save to cache
-            self._save_to_cache(database, acc_id, parsed_data)
-
-            return parsed_data
-
-        except Exception as e:
-            logger.error(f"Error parsing {acc_id}: {e}")
-            return None
+        # Fetch from NCBI as a batch of one, so single and batched
+        # retrieval share the streaming parse
+        parsed_data = self.fetch_genbank_batch(database, [acc_id]).get(acc_id)
+        if parsed_data is None:
+            logger.error(f"Could not retrieve {acc_id}")
+        return parsed_data
 
     def retrieve_batch(
         self,
@@ -244,16 +464,41 @@ class SequenceRetriever:
         Returns:
             List of parsed sequence dictionaries
         """
-        all_sequences = []
-
-        for i in range(0, len(id_list), max_batch_size):
-            batch = id_list[i:i + max_batch_size]
-            logger.info(f"Processing batch {i//max_batch_size + 1} ({len(batch)} sequences)")
-
-            for acc_id in batch:
-                seq_data = self.retrieve_and_parse(database, acc_id)
-                if seq_data:
-                    all_sequences.append(seq_data)
+        # Cache hits are resolved up front, so only uncached IDs reach the
+        # pool and the rate limiter, packed into full batches
+        found = {}
+        uncached = []
+        for acc_id in id_list:
+            if acc_id in found:
+                continue
+            found[acc_id] = self._load_from_cache(database, acc_id)
+            if not found[acc_id]:
+                uncached.append(acc_id)
+
+        if uncached:
+            batches = [uncached[i:i + max_batch_size] for i in range(0, len(uncached), max_batch_size)]
+            logger.info(f"{len(id_list) - len(uncached)} cached, fetching {len(uncached)} in {len(batches)} batches")
+
+            # Each batch is one efetch request; batches overlap on the
+            # network while the shared limiter keeps their start times
+            # within the NCBI rate limit
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for batch_num, fetched in enumerate(
+                    executor.map(lambda batch: self.fetch_genbank_batch(database, batch), batches), 1
+                ):
+                    logger.info(f"Processed batch {batch_num} ({len(fetched)} sequences)")
+                    found.update(fetched)
+
+                # IDs the batched responses could not be matched to are
+                # retried one at a time
+                missing = [acc_id for acc_id in uncached if not found[acc_id]]
+                for acc_id, seq_data in zip(missing, executor.map(
+                    lambda acc_id: self.retrieve_and_parse(database, acc_id),
+                    missing
+                )):
+                    found[acc_id] = seq_data
+
+        all_sequences = [found[acc_id] for acc_id in id_list if found[acc_id]]
 
         logger.info(f"Retrieved {len(all_sequences)} sequences successfully")
         return all_sequences
@@ -272,7 +517,7 @@ class SequenceRetriever:
             output_file: Output FASTA file path
             include_metadata: Include metadata in FASTA headers
         """
-        with open(output_file, 'w') as f:
+        with open(output_file, 'w', buffering=1 << 20) as f:
             for seq in sequences:
                 # Build FASTA header
                 if include_metadata:
@@ -286,12 +531,12 @@ class SequenceRetriever:
                 else:
                     header = f">{seq['accession']} {seq['description']}"
 
-                f.write(header + "\n")
+                # Wrap the sequence in 60-character lines in one regex pass
+                wrapped = _FASTA_WRAP_RE.sub(r"\1\n", seq['sequence'])
+                if wrapped and not wrapped.endswith("\n"):
+                    wrapped += "\n"
 
-                # Write sequence in 60-character lines
-                sequence = seq['sequence']
-                for i in range(0, len(sequence), 60):
-                    f.write(sequence[i:i+60] + "\n")
+                f.write(header + "\n" + wrapped)
 
         logger.info(f"Exported {len(sequences)} sequences to {output_file}")
 
@@ -308,9 +553,8 @@ class SequenceRetriever:
         self._rate_limit_wait()
 
         try:
-            handle = Entrez.efetch(db="sra", id=sra_id, retmode="xml")
-            records = Entrez.read(handle)
-            handle.close()
+            content = self._eutils_get("efetch.fcgi", db="sra", id=sra_id, retmode="xml")
+            records = Entrez.read(BytesIO(content))
 
             if not records:
                 return None
@@ -342,9 +586,9 @@ class SequenceRetriever:
             return None
 
 
-def create_retriever(use_cache: bool = True) -> SequenceRetriever:
+def create_retriever(use_cache: bool = True, session=None) -> SequenceRetriever:
     """Factory function to create SequenceRetriever instance"""
-    return SequenceRetriever(use_cache=use_cache)
+    return SequenceRetriever(use_cache=use_cache, session=session)
 
 
 if __name__ == "__main__":
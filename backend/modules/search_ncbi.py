@@ -2,48 +2,262 @@
 NCBI Search Module
 Handles searching across NCBI databases for EAB enzyme-related sequences
 """
-import time
-from typing import List, Dict, Optional, Set
-from Bio import Entrez
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Set, Tuple
 import logging
+import orjson
 from collections import defaultdict
+from functools import lru_cache
 
 from ..config import (
-    NCBI_EMAIL, NCBI_API_KEY, NCBI_TOOL, NCBI_RATE_LIMIT,
-    PRIMARY_ORGANISM, RELATED_SPECIES, ENZYME_KEYWORDS,
-    GUT_TISSUES, DEVELOPMENTAL_STAGES, DATABASES, MAX_RESULTS_PER_QUERY
+    NCBI_RATE_LIMIT, PRIMARY_ORGANISM, RELATED_SPECIES, ENZYME_KEYWORDS,
+    GUT_TISSUES, DEVELOPMENTAL_STAGES, DATABASES, MAX_RESULTS_PER_QUERY,
+    COMPILED_QUERIES, ELINK_BATCH_SIZE,
+    NCBI_SEARCH_CACHE_EXPIRE, NCBI_SEARCH_CACHE_TAG,
+    eutils_request, get_ncbi_session, get_ncbi_cache, ncbi_cache_key
 )
-
-# Configure Entrez
-Entrez.email = NCBI_EMAIL
-Entrez.tool = NCBI_TOOL
-if NCBI_API_KEY:
-    Entrez.api_key = NCBI_API_KEY
+from .rate_limit import RateLimiter
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Query fragments are fixed by config, so join them once at import
+_ENZYME_KEYWORD_CLAUSES = {
+    enzyme_type: "(" + " OR ".join(enzyme_data["keywords"]) + ")"
+    for enzyme_type, enzyme_data in ENZYME_KEYWORDS.items()
+}
+_ALL_ENZYME_KEYWORDS = tuple(sorted({
+    keyword for enzyme_data in ENZYME_KEYWORDS.values() for keyword in enzyme_data["keywords"]
+}))
+_ALL_ENZYME_CLAUSE = "(" + " OR ".join(_ALL_ENZYME_KEYWORDS) + ")"
+_TISSUE_TERMS = " OR ".join(GUT_TISSUES)
+_STAGE_TERMS = " OR ".join(DEVELOPMENTAL_STAGES)
+_TISSUE_CLAUSE = f"({_TISSUE_TERMS})"
+_STAGE_CLAUSE = f"({_STAGE_TERMS})"
+
+
+def _run(coroutine):
+    """
+    Run a coroutine to completion from synchronous code
+
+    Under a running event loop (async callers, notebooks) asyncio.run()
+    is not allowed, so the coroutine gets its own loop on a worker thread;
+    the caller blocks until it finishes either way.
+
+    Args:
+        coroutine: Coroutine to run
+
+    Returns:
+        The coroutine's result
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+def _transcriptome_query(organism: str) -> str:
+    """Query for gut transcriptome and RNA-Seq datasets of an organism"""
+    return COMPILED_QUERIES["gut_transcriptome"](
+        organism=organism,
+        tissues=_TISSUE_TERMS,
+        stages=_STAGE_TERMS
+    )
+
+
+@lru_cache(maxsize=256)
+def build_enzyme_query(
+    organism: str,
+    enzyme_type: Optional[str] = None,
+    include_gut: bool = True,
+    include_stages: bool = True
+) -> str:
+    """
+    Build a comprehensive search query for enzyme discovery
+
+    Args:
+        organism: Target organism name
+        enzyme_type: Specific enzyme type (e.g., 'cellulase') or None for all
+        include_gut: Include gut tissue keywords
+        include_stages: Include developmental stage keywords
+
+    Returns:
+        Formatted search query string
+    """
+    query_parts = [f'"{organism}"[Organism]']
+
+    # Add enzyme keywords, all enzyme types unless a known type is given
+    query_parts.append(_ENZYME_KEYWORD_CLAUSES.get(enzyme_type, _ALL_ENZYME_CLAUSE))
+
+    # Add tissue keywords
+    if include_gut:
+        query_parts.append(_TISSUE_CLAUSE)
+
+    # Add developmental stage keywords
+    if include_stages:
+        query_parts.append(_STAGE_CLAUSE)
+
+    return " AND ".join(query_parts)
+
 
 class NCBISearcher:
     """Search NCBI databases for enzyme sequences"""
 
-    def __init__(self, rate_limit: float = NCBI_RATE_LIMIT):
+    def __init__(
+        self,
+        rate_limit: float = NCBI_RATE_LIMIT,
+        session=None,
+        use_cache: bool = True
+    ):
         self.rate_limit = rate_limit
-        self.last_request_time = 0
+        # Concurrent searches share one token bucket
+        self.limiter = RateLimiter(rate=1.0 / rate_limit)
+        self.session = session if session is not None else get_ncbi_session()
+        self.cache = get_ncbi_cache() if use_cache else None
+        # Successful search results of this session, by (database, query, retmax, retstart)
+        self._results: Dict[Tuple, Dict[str, any]] = {}
+
+    def clear_cache(self):
+        """Forget this session's search results and the cached search responses on disk"""
+        self._results.clear()
+        if self.cache is not None:
+            self.cache.evict(NCBI_SEARCH_CACHE_TAG)
+
+    def close(self):
+        """
+        Forget this session's search results
+
+        The HTTP session is shared with other NCBI clients (or owned by the
+        caller) and stays open; close_ncbi_session() closes the shared one.
+        """
+        self._results.clear()
+
+    def __enter__(self) -> "NCBISearcher":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def _rate_limit_wait(self):
-        """Ensure compliance with NCBI rate limits"""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.rate_limit:
-            time.sleep(self.rate_limit - elapsed)
-        self.last_request_time = time.time()
+        """Ensure compliance with NCBI rate limits (safe across threads)"""
+        self.limiter.wait()
+
+    def _eutils_get(self, endpoint: str, **params) -> bytes:
+        """
+        Call an E-utilities endpoint over the shared HTTP session
+
+        Args:
+            endpoint: E-utilities endpoint (e.g., 'esearch.fcgi')
+            params: Query parameters
+
+        Returns:
+            Raw response body
+        """
+        # Cached responses skip both the network and the rate limit. Note
+        # that history-server keys (WebEnv) in a cached esearch response
+        # may already have expired on NCBI's side.
+        key = ncbi_cache_key(endpoint, params)
+        content = self._cache_get(key)
+        if content is None:
+            self._rate_limit_wait()
+            content = self._fetch(endpoint, key, params)
+        return content
+
+    async def _aeutils_get(self, endpoint: str, post: bool = False, cache: bool = True, **params) -> bytes:
+        """
+        Call an E-utilities endpoint without blocking the event loop
+
+        Waiting for the rate limit happens on the event loop; only the
+        request itself runs on a worker thread.
+
+        Args:
+            endpoint: E-utilities endpoint (e.g., 'esearch.fcgi')
+            post: Send the parameters as a form POST (for long ID lists)
+            cache: Read and store the response in the response cache
+            params: Query parameters
+
+        Returns:
+            Raw response body
+        """
+        key = ncbi_cache_key(endpoint, params) if cache else None
+        content = self._cache_get(key) if cache else None
+        if content is None:
+            await self.limiter.acquire()
+            content = await asyncio.to_thread(self._fetch, endpoint, key, params, post)
+        return content
+
+    def _cache_get(self, key: str) -> Optional[bytes]:
+        """Look up a cached response body"""
+        if self.cache is None:
+            return None
+        return self.cache.get(key)
+
+    def _fetch(self, endpoint: str, key: str, params: Dict, post: bool = False) -> bytes:
+        """
+        Issue an E-utilities request and cache its response
+
+        HTTP 429 responses are retried by the shared session, honoring
+        NCBI's Retry-After header.
+
+        Args:
+            endpoint: E-utilities endpoint
+            key: Cache key of the request, or None to leave it uncached
+            params: Query parameters
+            post: Send the parameters as a form POST instead of a GET
+
+        Returns:
+            Raw response body
+        """
+        content = eutils_request(self.session, endpoint, params, post=post).content
+
+        if self.cache is not None and key is not None:
+            self.cache.set(key, content, expire=NCBI_SEARCH_CACHE_EXPIRE, tag=NCBI_SEARCH_CACHE_TAG)
+
+        return content
+
+    def _search_result(self, memo_key: Optional[Tuple], database: str, query: str, content: bytes) -> Dict[str, any]:
+        """Build a search result from an esearch JSON response, memoized under memo_key unless None"""
+        search_results = orjson.loads(content)["esearchresult"]
+
+        id_list = search_results.get("idlist", [])
+        count = int(search_results.get("count", 0))
+
+        logger.info(f"Found {count} total results, retrieved {len(id_list)} IDs")
+
+        result = {
+            "database": database,
+            "query": query,
+            "id_list": id_list,
+            "count": count,
+            "webenv": search_results.get("webenv"),
+            "query_key": search_results.get("querykey")
+        }
+        if memo_key is not None:
+            self._results[memo_key] = result
+        return dict(result)
+
+    def _search_error(self, database: str, query: str, error: Exception) -> Dict[str, any]:
+        """Build the empty search result returned when a search fails"""
+        logger.error(f"Error searching {database}: {error}")
+        return {
+            "database": database,
+            "query": query,
+            "id_list": [],
+            "count": 0,
+            "error": str(error)
+        }
 
     def search_database(
         self,
         database: str,
         query: str,
         max_results: int = MAX_RESULTS_PER_QUERY,
-        retstart: int = 0
+        retstart: int = 0,
+        fetch_ids: bool = True
     ) -> Dict[str, any]:
         """
         Search a specific NCBI database
@@ -53,104 +267,100 @@ class NCBISearcher:
             query: Search query string
             max_results: Maximum number of results to return
             retstart: Starting index for pagination
+            fetch_ids: Return the matching IDs; when False only the count
+                and the WebEnv/QueryKey history handle come back, for
+                fetching the records by history (much smaller response).
+                These searches always go to NCBI, since a cached history
+                handle may have expired there
+
+        Returns:
+            Dictionary containing search results and metadata
+        """
+        return _run(self.asearch_database(database, query, max_results, retstart, fetch_ids))
+
+    async def asearch_database(
+        self,
+        database: str,
+        query: str,
+        max_results: int = MAX_RESULTS_PER_QUERY,
+        retstart: int = 0,
+        fetch_ids: bool = True
+    ) -> Dict[str, any]:
+        """
+        Search a specific NCBI database without blocking the event loop
+
+        Many searches can be awaited together; the shared limiter spaces
+        out their requests.
+
+        Args:
+            database: NCBI database name (e.g., 'nucleotide', 'protein')
+            query: Search query string
+            max_results: Maximum number of results to return
+            retstart: Starting index for pagination
+            fetch_ids: Return the matching IDs; when False only the count
+                and the WebEnv/QueryKey history handle come back, for
+                fetching the records by history (much smaller response).
+                These searches always go to NCBI, since a cached history
+                handle may have expired there
 
         Returns:
             Dictionary containing search results and metadata
         """
-        self._rate_limit_wait()
+        retmax = max_results if fetch_ids else 0
+        # History handles are only valid for a while, so searches made for
+        # them bypass both this session's results and the response cache
+        memo_key = (database, query, retmax, retstart) if fetch_ids else None
+        if memo_key in self._results:
+            return dict(self._results[memo_key])
 
         try:
             logger.info(f"Searching {database} with query: {query[:100]}...")
 
-            # Search for IDs
-            handle = Entrez.esearch(
+            content = await self._aeutils_get(
+                "esearch.fcgi",
+                cache=fetch_ids,
                 db=database,
                 term=query,
-                retmax=max_results,
+                retmax=retmax,
                 retstart=retstart,
-                usehistory="y"
+                usehistory="y",
+                retmode="json"
             )
-            search_results = Entrez.read(handle)
-            handle.close()
-
-            id_list = search_results.get("IdList", [])
-            count = int(search_results.get("Count", 0))
+            return self._search_result(memo_key, database, query, content)
 
-            logger.info(f"Found {count} total results, retrieved {len(id_list)} IDs")
+        except Exception as e:
+            return self._search_error(database, query, e)
 
-            return {
-                "database": database,
-                "query": query,
-                "id_list": id_list,
-                "count": count,
-                "webenv": search_results.get("WebEnv"),
-                "query_key": search_results.get("QueryKey")
-            }
+    # Memoized at module level; kept on the class for existing callers
+    build_enzyme_query = staticmethod(build_enzyme_query)
 
-        except Exception as e:
-            logger.error(f"Error searching {database}: {e}")
-            return {
-                "database": database,
-                "query": query,
-                "id_list": [],
-                "count": 0,
-                "error": str(e)
-            }
-
-    def build_enzyme_query(
+    def search_all_organisms(
         self,
-        organism: str,
+        database: str = "protein",
         enzyme_type: Optional[str] = None,
-        include_gut: bool = True,
-        include_stages: bool = True
-    ) -> str:
+        include_related: bool = True
+    ) -> List[Dict[str, any]]:
         """
-        Build a comprehensive search query for enzyme discovery
+        Search for enzymes across primary organism and related species
 
         Args:
-            organism: Target organism name
-            enzyme_type: Specific enzyme type (e.g., 'cellulase') or None for all
-            include_gut: Include gut tissue keywords
-            include_stages: Include developmental stage keywords
+            database: NCBI database to search
+            enzyme_type: Specific enzyme type or None for all
+            include_related: Include related Buprestidae species
 
         Returns:
-            Formatted search query string
-        """
-        query_parts = [f'"{organism}"[Organism]']
-
-        # Add enzyme keywords
-        if enzyme_type and enzyme_type in ENZYME_KEYWORDS:
-            enzyme_data = ENZYME_KEYWORDS[enzyme_type]
-            keywords = " OR ".join(enzyme_data["keywords"])
-            query_parts.append(f"({keywords})")
-        else:
-            # All enzyme types
-            all_keywords = []
-            for enzyme_data in ENZYME_KEYWORDS.values():
-                all_keywords.extend(enzyme_data["keywords"])
-            keywords = " OR ".join(set(all_keywords))
-            query_parts.append(f"({keywords})")
-
-        # Add tissue keywords
-        if include_gut:
-            tissues = " OR ".join(GUT_TISSUES)
-            query_parts.append(f"({tissues})")
-
-        # Add developmental stage keywords
-        if include_stages:
-            stages = " OR ".join(DEVELOPMENTAL_STAGES)
-            query_parts.append(f"({stages})")
-
-        return " AND ".join(query_parts)
+            List of search result dictionaries
+        """
+        return _run(self.asearch_all_organisms(database, enzyme_type, include_related))
 
-    def search_all_organisms(
+    async def asearch_all_organisms(
         self,
         database: str = "protein",
         enzyme_type: Optional[str] = None,
         include_related: bool = True
     ) -> List[Dict[str, any]]:
         """
-        Search for enzymes across primary organism and related species
+        Search all organisms concurrently (see search_all_organisms)
 
         Args:
             database: NCBI database to search
@@ -158,30 +368,29 @@ class NCBISearcher:
             include_related: Include related Buprestidae species
 
         Returns:
-            List of search result dictionaries
+            List of search result dictionaries, in organism order
         """
         organisms = [PRIMARY_ORGANISM]
         if include_related:
             organisms.extend(RELATED_SPECIES)
 
-        all_results = []
-
-        for organism in organisms:
-            query = self.build_enzyme_query(
-                organism=organism,
-                enzyme_type=enzyme_type,
-                include_gut=True,
-                include_stages=True
-            )
-
-            results = self.search_database(
+        all_results = await asyncio.gather(*[
+            self.asearch_database(
                 database=database,
-                query=query
+                query=self.build_enzyme_query(
+                    organism=organism,
+                    enzyme_type=enzyme_type,
+                    include_gut=True,
+                    include_stages=True
+                )
             )
+            for organism in organisms
+        ])
+
+        for organism, results in zip(organisms, all_results):
             results["organism"] = organism
-            all_results.append(results)
 
-        return all_results
+        return list(all_results)
 
     def search_transcriptomes(
         self,
@@ -196,17 +405,7 @@ class NCBISearcher:
         Returns:
             Search results dictionary
         """
-        tissues = " OR ".join(GUT_TISSUES)
-        stages = " OR ".join(DEVELOPMENTAL_STAGES)
-
-        query = (
-            f'"{organism}"[Organism] AND '
-            f'({tissues}) AND '
-            f'({stages}) AND '
-            f'(transcriptome OR "RNA-Seq" OR "RNA sequencing")'
-        )
-
-        return self.search_database(database="sra", query=query)
+        return self.search_database(database="sra", query=_transcriptome_query(organism))
 
     def search_by_ec_number(
         self,
@@ -263,17 +462,16 @@ class NCBISearcher:
         Returns:
             List of taxonomy IDs
         """
-        self._rate_limit_wait()
-
         try:
-            handle = Entrez.esearch(
+            content = self._eutils_get(
+                "esearch.fcgi",
                 db="taxonomy",
-                term=f'"{family}"[Scientific Name]'
+                term=f'"{family}"[Scientific Name]',
+                retmode="json"
             )
-            results = Entrez.read(handle)
-            handle.close()
+            results = orjson.loads(content)["esearchresult"]
 
-            return results.get("IdList", [])
+            return results.get("idlist", [])
 
         except Exception as e:
             logger.error(f"Error fetching taxonomy IDs: {e}")
@@ -296,33 +494,81 @@ class NCBISearcher:
         Returns:
             List of linked IDs in target database
         """
-        if not id_list:
-            return []
+        return _run(self.alink_databases(db_from, db_to, id_list))
 
-        self._rate_limit_wait()
+    async def alink_databases(
+        self,
+        db_from: str,
+        db_to: str,
+        id_list: List[str]
+    ) -> List[str]:
+        """
+        Use ELink to find connections between databases, concurrently
 
-        try:
-            handle = Entrez.elink(
-                dbfrom=db_from,
-                db=db_to,
-                id=",".join(str(i) for i in id_list)
-            )
-            results = Entrez.read(handle)
-            handle.close()
+        IDs are POSTed in batches of ELINK_BATCH_SIZE so long lists are not
+        truncated by URL length limits; batches share the rate limiter.
 
-            linked_ids = []
-            for linkset in results:
-                if "LinkSetDb" in linkset:
-                    for link_db in linkset["LinkSetDb"]:
-                        for link in link_db.get("Link", []):
-                            linked_ids.append(link["Id"])
+        Args:
+            db_from: Source database
+            db_to: Target database
+            id_list: List of IDs from source database
 
-            return list(set(linked_ids))
+        Returns:
+            List of linked IDs in target database
+        """
+        if not id_list:
+            return []
+
+        # IDs are normally strings already; only integer IDs need converting
+        if not all(isinstance(i, str) for i in id_list):
+            id_list = list(map(str, id_list))
 
+        chunks = [
+            ",".join(id_list[i:i + ELINK_BATCH_SIZE])
+            for i in range(0, len(id_list), ELINK_BATCH_SIZE)
+        ]
+
+        try:
+            responses = await asyncio.gather(*[
+                self._aelink(db_from, db_to, chunk) for chunk in chunks
+            ])
         except Exception as e:
             logger.error(f"Error linking databases: {e}")
             return []
 
+        # Deduplicate each link list in one C-level update, keeping
+        # first-seen order (dicts preserve insertion order)
+        linked: Dict[str, None] = {}
+        add_links = linked.update
+        for linksets in responses:
+            for linkset in linksets:
+                for link_db in linkset.get("linksetdbs", ()):
+                    add_links(dict.fromkeys(link_db.get("links", ())))
+
+        return list(linked)
+
+    async def _aelink(self, db_from: str, db_to: str, ids: str) -> List:
+        """
+        Run a single ELink request for one batch of IDs
+
+        Args:
+            db_from: Source database
+            db_to: Target database
+            ids: Comma-separated batch of source IDs
+
+        Returns:
+            ELink link sets from the JSON response
+        """
+        content = await self._aeutils_get(
+            "elink.fcgi",
+            post=True,
+            dbfrom=db_from,
+            db=db_to,
+            id=ids,
+            retmode="json"
+        )
+        return orjson.loads(content).get("linksets", [])
+
     def comprehensive_search(
         self,
         enzyme_type: Optional[str] = None,
@@ -331,6 +577,23 @@ class NCBISearcher:
         """
         Perform comprehensive search across multiple databases and organisms
 
+        Args:
+            enzyme_type: Specific enzyme type or None for all
+            databases: List of databases to search (default: all configured)
+
+        Returns:
+            Dictionary mapping database names to search results
+        """
+        return _run(self.acomprehensive_search(enzyme_type, databases))
+
+    async def acomprehensive_search(
+        self,
+        enzyme_type: Optional[str] = None,
+        databases: Optional[List[str]] = None
+    ) -> Dict[str, List[Dict]]:
+        """
+        Search all databases and organisms concurrently (see comprehensive_search)
+
         Args:
             enzyme_type: Specific enzyme type or None for all
             databases: List of databases to search (default: all configured)
@@ -343,33 +606,39 @@ class NCBISearcher:
 
         logger.info(f"Starting comprehensive search for enzyme: {enzyme_type or 'all'}")
 
-        results_by_db = defaultdict(list)
-
-        for database in databases:
-            logger.info(f"Searching {database}...")
-
-            # Search primary organism and related species
-            organism_results = self.search_all_organisms(
+        # Every organism x database query is in flight at once; the shared
+        # limiter spaces out the actual requests
+        searches = [
+            self.asearch_all_organisms(
                 database=database,
                 enzyme_type=enzyme_type,
                 include_related=True
             )
+            for database in databases
+        ]
+        # Also search for transcriptomes in SRA
+        if "sra" in databases:
+            searches.append(self.asearch_database(
+                database="sra",
+                query=_transcriptome_query(PRIMARY_ORGANISM)
+            ))
+
+        results = await asyncio.gather(*searches)
 
+        results_by_db = defaultdict(list)
+        for database, organism_results in zip(databases, results):
             results_by_db[database].extend(organism_results)
 
-        # Also search for transcriptomes in SRA
         if "sra" in databases:
-            logger.info("Searching transcriptomes...")
-            transcriptome_results = self.search_transcriptomes()
-            results_by_db["sra_transcriptomes"] = [transcriptome_results]
+            results_by_db["sra_transcriptomes"] = [results[-1]]
 
         logger.info("Comprehensive search complete")
         return dict(results_by_db)
 
 
-def create_searcher() -> NCBISearcher:
+def create_searcher(session=None, use_cache: bool = True) -> NCBISearcher:
     """Factory function to create NCBISearcher instance"""
-    return NCBISearcher()
+    return NCBISearcher(session=session, use_cache=use_cache)
 
 
 if __name__ == "__main__":
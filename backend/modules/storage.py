@@ -3,31 +3,116 @@ Storage Module
 Handles SQLite database operations for enzyme data
 """
 import sqlite3
-import json
-from typing import List, Dict, Optional, Any
+import orjson
+import threading
+from typing import Iterator, List, Dict, Optional, Any, Tuple
 from pathlib import Path
 import logging
+from contextlib import contextmanager
 from datetime import datetime
 
-from ..config import DB_PATH
+from ..config import DB_PATH, ensure_dirs
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _dumps(value: Any) -> str:
+    """Serialize a JSON column value with orjson"""
+    return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+
+SEQUENCE_COLUMNS = (
+    "accession", "source_db", "organism_id", "gene_name", "protein_name",
+    "enzyme_type", "ec_number", "gh_family", "sequence", "length",
+    "description", "tissue", "dev_stage", "confidence",
+    "annotation_data", "features"
+)
+
+# Columns callers may project from the sequences/organisms join
+SELECTABLE_COLUMNS = {
+    "id": "s.id",
+    **{column: f"s.{column}" for column in SEQUENCE_COLUMNS},
+    "created_at": "s.created_at",
+    "organism_name": "o.name AS organism_name",
+    "family": "o.family"
+}
+
+# Insert a sequences row, or overwrite every column of an existing accession
+UPSERT_SEQUENCE_SQL = (
+    f"INSERT INTO sequences ({', '.join(SEQUENCE_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(SEQUENCE_COLUMNS))}) "
+    "ON CONFLICT(accession) DO UPDATE SET "
+    + ", ".join(f"{column} = excluded.{column}" for column in SEQUENCE_COLUMNS[1:])
+)
+
+
 class DatabaseManager:
     """Manage SQLite database for enzyme sequences"""
 
     def __init__(self, db_path: str = DB_PATH):
         self.db_path = db_path
+        # One connection for the manager's lifetime, shared across threads
+        # under a lock, so writes don't pay a connect per call
+        self._lock = threading.RLock()
+        ensure_dirs(str(Path(self.db_path).parent))
+        self._conn = self._connect()
         self._ensure_database()
 
+    def _connect(self) -> sqlite3.Connection:
+        """Open the connection with its performance pragmas"""
+        # Autocommit mode: transactions are opened explicitly by _transaction
+        conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        # WAL is persistent: readers no longer block the pipeline's writes
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-65536')
+        conn.execute('PRAGMA mmap_size=268435456')
+        return conn
+
+    @contextmanager
+    def _transaction(self, immediate: bool = False) -> Iterator[sqlite3.Cursor]:
+        """
+        Run the enclosed statements in one transaction
+
+        Nested uses join the outer transaction, so a whole batch shares
+        a single commit.
+
+        Args:
+            immediate: Take the write lock up front (BEGIN IMMEDIATE)
+
+        Yields:
+            Cursor on the shared connection
+        """
+        with self._lock:
+            cursor = self._conn.cursor()
+            if self._conn.in_transaction:
+                yield cursor
+                return
+
+            cursor.execute('BEGIN IMMEDIATE' if immediate else 'BEGIN')
+            try:
+                yield cursor
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._conn.commit()
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "DatabaseManager":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def _ensure_database(self):
         """Create database and tables if they don't exist"""
-        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
-
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        with self._transaction() as cursor:
 
             # Organisms table
             cursor.execute('''
@@ -134,146 +219,293 @@ class DatabaseManager:
             ''')
 
             # Create indexes
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_seq_type_conf'"
+            )
+            needs_analyze = cursor.fetchone() is None
+
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_sequences_accession ON sequences(accession)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_sequences_enzyme_type ON sequences(enzyme_type)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_sequences_organism ON sequences(organism_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_sequences_confidence ON sequences(confidence)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_blast_query ON blast_results(query_id)')
+            # Keyword counts are recomputed per keyword from its links
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_sequence_keywords_keyword ON sequence_keywords(keyword_id)')
+
+            # Composite indexes serve filtered queries ordered by confidence
+            # as a range scan without a temp sort; they also cover the
+            # single-column enzyme_type and organism_id lookups
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_seq_type_conf ON sequences(enzyme_type, confidence DESC)'
+            )
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_seq_org_conf ON sequences(organism_id, confidence DESC)'
+            )
+            cursor.execute('DROP INDEX IF EXISTS idx_sequences_enzyme_type')
+            cursor.execute('DROP INDEX IF EXISTS idx_sequences_organism')
+
+            # Organisms are upserted by name. Databases created before this
+            # index may hold several rows per name, which must be merged
+            # before the unique index can be built
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_organisms_name'"
+            )
+            if cursor.fetchone() is None:
+                self._merge_duplicate_organisms(cursor)
+            cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_organisms_name ON organisms(name)')
+
+            # Gather planner statistics once, when the indexes are new
+            if needs_analyze:
+                cursor.execute('ANALYZE')
 
-            conn.commit()
             logger.info(f"Database initialized at {self.db_path}")
 
+    def _merge_duplicate_organisms(self, cursor: sqlite3.Cursor):
+        """
+        Fold organisms that share a name into the oldest row of that name
+
+        Sequences, BioProjects and SRA runs are repointed to the kept row,
+        which takes over any taxid, family or taxonomy it lacks from the
+        rows merged into it.
+
+        Args:
+            cursor: Cursor inside the caller's transaction
+        """
+        cursor.execute('''
+            CREATE TEMP TABLE organism_merge AS
+            SELECT o.id AS old_id, k.keep_id
+            FROM organisms o
+            JOIN (
+                SELECT name, MIN(id) AS keep_id FROM organisms
+                GROUP BY name HAVING COUNT(*) > 1
+            ) k ON o.name = k.name
+            WHERE o.id != k.keep_id
+        ''')
+        try:
+            cursor.execute('SELECT COUNT(*) FROM organism_merge')
+            merged = cursor.fetchone()[0]
+            if not merged:
+                return
+
+            for table in ("sequences", "bioprojects", "sra_runs"):
+                cursor.execute(f'''
+                    UPDATE {table}
+                    SET organism_id = (SELECT keep_id FROM organism_merge WHERE old_id = organism_id)
+                    WHERE organism_id IN (SELECT old_id FROM organism_merge)
+                ''')
+
+            # Details are collected before the duplicates are deleted, as a
+            # taxid cannot move to the kept row while its old row holds it
+            cursor.execute('''
+                CREATE TEMP TABLE organism_merge_details AS
+                SELECT m.keep_id, MIN(o.taxid) AS taxid, MIN(o.family) AS family,
+                       MIN(o.taxonomy) AS taxonomy
+                FROM organism_merge m JOIN organisms o ON o.id = m.old_id
+                GROUP BY m.keep_id
+            ''')
+            cursor.execute('DELETE FROM organisms WHERE id IN (SELECT old_id FROM organism_merge)')
+            cursor.execute('''
+                UPDATE organisms SET
+                    taxid = COALESCE(taxid, (SELECT taxid FROM organism_merge_details WHERE keep_id = organisms.id)),
+                    family = COALESCE(family, (SELECT family FROM organism_merge_details WHERE keep_id = organisms.id)),
+                    taxonomy = COALESCE(taxonomy, (SELECT taxonomy FROM organism_merge_details WHERE keep_id = organisms.id))
+                WHERE id IN (SELECT keep_id FROM organism_merge_details)
+            ''')
+            cursor.execute('DROP TABLE organism_merge_details')
+
+            logger.warning(f"Merged {merged} duplicate organism rows into rows of the same name")
+        finally:
+            cursor.execute('DROP TABLE organism_merge')
+
     def insert_organism(self, name: str, taxid: Optional[str] = None, family: Optional[str] = None, taxonomy: Optional[List[str]] = None) -> int:
         """Insert or get organism ID"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        with self._transaction() as cursor:
+            # Existing organisms keep their stored details
+            taxonomy_json = _dumps(taxonomy) if taxonomy else None
+            cursor.execute('''
+                INSERT INTO organisms (taxid, name, family, taxonomy)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT DO NOTHING
+                RETURNING id
+            ''', (taxid, name, family, taxonomy_json))
+            row = cursor.fetchone()
+            if row is not None:
+                return row[0]
 
-            # Check if exists
             cursor.execute('SELECT id FROM organisms WHERE name = ?', (name,))
-            result = cursor.fetchone()
-            if result:
-                return result[0]
+            row = cursor.fetchone()
+            if row is not None:
+                return row[0]
 
-            # Insert new
-            taxonomy_json = json.dumps(taxonomy) if taxonomy else None
+            # The taxid is already stored under another name
+            logger.warning(f"Taxid {taxid} already belongs to another organism; storing {name} without it")
             cursor.execute('''
                 INSERT INTO organisms (taxid, name, family, taxonomy)
-                VALUES (?, ?, ?, ?)
-            ''', (taxid, name, family, taxonomy_json))
-            conn.commit()
-            return cursor.lastrowid
+                VALUES (NULL, ?, ?, ?)
+                RETURNING id
+            ''', (name, family, taxonomy_json))
+            return cursor.fetchone()[0]
 
     def insert_sequence(self, sequence_data: Dict) -> int:
-        """Insert a sequence into the database"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-
+        """Insert a sequence into the database, updating it if it exists"""
+        with self._transaction() as cursor:
             # Get or create organism
             organism_id = self.insert_organism(
                 name=sequence_data.get("organism", "Unknown"),
                 taxonomy=sequence_data.get("taxonomy")
             )
 
-            # Prepare data
-            annotation_json = json.dumps(sequence_data.get("annotation", {}))
-            features_json = json.dumps(sequence_data.get("features", []))
+            cursor.execute(
+                UPSERT_SEQUENCE_SQL + ' RETURNING id',
+                self._sequence_row(sequence_data, organism_id)
+            )
+            seq_id = cursor.fetchone()[0]
+
+            # Insert keywords
+            keywords = sequence_data.get("annotation", {}).get("keywords_found", [])
+            self._link_keywords(cursor, [(seq_id, keyword) for keyword in keywords])
+
+            return seq_id
+
+    def _link_keywords(self, cursor: sqlite3.Cursor, links: List[Tuple[int, str]], category: str = "enzyme"):
+        """
+        Link keywords to sequences with set-based statements
+
+        Args:
+            cursor: Cursor inside the caller's transaction
+            links: (sequence_id, keyword) pairs
+            category: Category recorded for new keywords
+        """
+        if not links:
+            return
+
+        keywords = list(dict.fromkeys(keyword for _, keyword in links))
+        cursor.executemany(
+            'INSERT INTO keywords (keyword, category, count) VALUES (?, ?, 0) ON CONFLICT(keyword) DO NOTHING',
+            [(keyword, category) for keyword in keywords]
+        )
+        keyword_ids = self._select_ids(cursor, "keywords", "keyword", keywords)
+
+        cursor.executemany('''
+            INSERT OR IGNORE INTO sequence_keywords (sequence_id, keyword_id)
+            VALUES (?, ?)
+        ''', [(sequence_id, keyword_ids[keyword]) for sequence_id, keyword in links])
+
+        # Each keyword counts the sequences linked to it
+        cursor.executemany('''
+            UPDATE keywords SET count = (
+                SELECT COUNT(*) FROM sequence_keywords WHERE keyword_id = keywords.id
+            ) WHERE id = ?
+        ''', [(keyword_ids[keyword],) for keyword in keywords])
+
+    def _sequence_row(self, sequence_data: Dict, organism_id: int) -> tuple:
+        """Column values for a sequences row, accession first"""
+        return (
+            sequence_data.get("accession"),
+            sequence_data.get("source_database", "unknown"),
+            organism_id,
+            sequence_data.get("gene_name"),
+            sequence_data.get("protein_name"),
+            sequence_data.get("enzyme_type"),
+            sequence_data.get("ec_number_annotated"),
+            sequence_data.get("gh_family"),
+            sequence_data.get("sequence", ""),
+            sequence_data.get("length", 0),
+            sequence_data.get("description"),
+            sequence_data.get("tissue"),
+            sequence_data.get("stage"),
+            sequence_data.get("confidence", 0.0),
+            _dumps(sequence_data.get("annotation", {})),
+            _dumps(sequence_data.get("features", []))
+        )
+
+    def _select_ids(
+        self,
+        cursor: sqlite3.Cursor,
+        table: str,
+        column: str,
+        values: List[str],
+        chunk_size: int = 500
+    ) -> Dict[str, int]:
+        """Map values of a unique column to row ids, querying in chunks"""
+        ids = {}
+        for i in range(0, len(values), chunk_size):
+            chunk = values[i:i + chunk_size]
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(
+                f'SELECT {column}, id FROM {table} WHERE {column} IN ({placeholders})',
+                chunk
+            )
+            ids.update(cursor.fetchall())
+        return ids
 
-            try:
-                cursor.execute('''
-                    INSERT INTO sequences (
-                        accession, source_db, organism_id, gene_name, protein_name,
-                        enzyme_type, ec_number, gh_family, sequence, length,
-                        description, tissue, dev_stage, confidence,
-                        annotation_data, features
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    sequence_data.get("accession"),
-                    sequence_data.get("source_database", "unknown"),
-                    organism_id,
-                    sequence_data.get("gene_name"),
-                    sequence_data.get("protein_name"),
-                    sequence_data.get("enzyme_type"),
-                    sequence_data.get("ec_number_annotated"),
-                    sequence_data.get("gh_family"),
-                    sequence_data.get("sequence", ""),
-                    sequence_data.get("length", 0),
-                    sequence_data.get("description"),
-                    sequence_data.get("tissue"),
-                    sequence_data.get("stage"),
-                    sequence_data.get("confidence", 0.0),
-                    annotation_json,
-                    features_json
-                ))
-                conn.commit()
-                seq_id = cursor.lastrowid
-
-                # Insert keywords
-                keywords = sequence_data.get("annotation", {}).get("keywords_found", [])
-                for keyword in keywords:
-                    self._insert_keyword_link(seq_id, keyword, "enzyme")
-
-                return seq_id
-
-            except sqlite3.IntegrityError:
-                # Sequence already exists, update it
-                cursor.execute('''
-                    UPDATE sequences SET
-                        source_db = ?, organism_id = ?, gene_name = ?,
-                        protein_name = ?, enzyme_type = ?, ec_number = ?,
-                        gh_family = ?, sequence = ?, length = ?,
-                        description = ?, tissue = ?, dev_stage = ?,
-                        confidence = ?, annotation_data = ?, features = ?
-                    WHERE accession = ?
-                ''', (
-                    sequence_data.get("source_database", "unknown"),
-                    organism_id,
-                    sequence_data.get("gene_name"),
-                    sequence_data.get("protein_name"),
-                    sequence_data.get("enzyme_type"),
-                    sequence_data.get("ec_number_annotated"),
-                    sequence_data.get("gh_family"),
-                    sequence_data.get("sequence", ""),
-                    sequence_data.get("length", 0),
-                    sequence_data.get("description"),
-                    sequence_data.get("tissue"),
-                    sequence_data.get("stage"),
-                    sequence_data.get("confidence", 0.0),
-                    annotation_json,
-                    features_json,
-                    sequence_data.get("accession")
-                ))
-                conn.commit()
-
-                # Get existing ID
-                cursor.execute('SELECT id FROM sequences WHERE accession = ?', (sequence_data.get("accession"),))
-                return cursor.fetchone()[0]
-
-    def _insert_keyword_link(self, sequence_id: int, keyword: str, category: str):
-        """Link a keyword to a sequence"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-
-            # Insert or get keyword
-            cursor.execute('SELECT id FROM keywords WHERE keyword = ?', (keyword,))
-            result = cursor.fetchone()
-
-            if result:
-                keyword_id = result[0]
-                cursor.execute('UPDATE keywords SET count = count + 1 WHERE id = ?', (keyword_id,))
-            else:
-                cursor.execute('INSERT INTO keywords (keyword, category, count) VALUES (?, ?, 1)', (keyword, category))
-                keyword_id = cursor.lastrowid
-
-            # Link sequence to keyword
-            cursor.execute('''
-                INSERT OR IGNORE INTO sequence_keywords (sequence_id, keyword_id)
-                VALUES (?, ?)
-            ''', (sequence_id, keyword_id))
+    def insert_batch(self, sequences: List[Dict]) -> int:
+        """
+        Insert multiple sequences in a single transaction
 
-            conn.commit()
+        Args:
+            sequences: List of annotated sequence dictionaries
 
-    def insert_batch(self, sequences: List[Dict]) -> int:
-        """Insert multiple sequences"""
+        Returns:
+            Number of sequences inserted or updated
+        """
+        valid = [seq for seq in sequences if seq.get("accession")]
+        for seq in sequences:
+            if not seq.get("accession"):
+                logger.error(f"Error inserting sequence without accession: {seq.get('description')}")
+        if not valid:
+            return 0
+
+        try:
+            with self._transaction(immediate=True) as cursor:
+                self._write_batch(cursor, valid)
+        except Exception as e:
+            # Fall back to row-by-row so one bad record doesn't lose the batch
+            logger.error(f"Batch insert failed ({e}), retrying row by row")
+            return self._insert_rows(valid)
+
+        logger.info(f"Inserted {len(valid)}/{len(sequences)} sequences")
+        return len(valid)
+
+    def _write_batch(self, cursor: sqlite3.Cursor, sequences: List[Dict]):
+        """Write a batch of sequences with executemany inside the caller's transaction"""
+        # Create missing organisms, then resolve every name in one pass
+        taxonomies = {}
+        for seq in sequences:
+            taxonomies.setdefault(seq.get("organism", "Unknown"), seq.get("taxonomy"))
+        cursor.executemany('''
+            INSERT OR IGNORE INTO organisms (taxid, name, family, taxonomy)
+            VALUES (?, ?, ?, ?)
+        ''', [
+            (None, name, None, _dumps(taxonomy) if taxonomy else None)
+            for name, taxonomy in taxonomies.items()
+        ])
+        organism_ids = self._select_ids(cursor, "organisms", "name", list(taxonomies))
+
+        # Rows are upserted in order, so for repeated accessions the last
+        # record wins
+        cursor.executemany(UPSERT_SEQUENCE_SQL, [
+            self._sequence_row(seq, organism_ids[seq.get("organism", "Unknown")])
+            for seq in sequences
+        ])
+
+        # Link keywords
+        links = [
+            (seq.get("accession"), keyword)
+            for seq in sequences
+            for keyword in seq.get("annotation", {}).get("keywords_found", [])
+        ]
+        if not links:
+            return
+
+        sequence_ids = self._select_ids(
+            cursor, "sequences", "accession",
+            list({accession for accession, _ in links})
+        )
+        self._link_keywords(cursor, [
+            (sequence_ids[accession], keyword) for accession, keyword in links
+        ])
+
+    def _insert_rows(self, sequences: List[Dict]) -> int:
+        """Insert sequences one at a time, skipping records that fail"""
         count = 0
         for seq in sequences:
             try:
@@ -285,6 +517,51 @@ class DatabaseManager:
         logger.info(f"Inserted {count}/{len(sequences)} sequences")
         return count
 
+    def _sequence_query(
+        self,
+        enzyme_type: Optional[str] = None,
+        min_confidence: float = 0.0,
+        organism: Optional[str] = None,
+        tissue: Optional[str] = None,
+        limit: Optional[int] = None,
+        columns: Optional[List[str]] = None
+    ) -> Tuple[str, List]:
+        """Build the filtered sequences query and its parameters"""
+        if columns is None:
+            projection = 's.*, o.name as organism_name, o.family'
+        else:
+            unknown = [column for column in columns if column not in SELECTABLE_COLUMNS]
+            if unknown:
+                raise ValueError(f"Unknown sequence columns: {unknown}")
+            projection = ', '.join(SELECTABLE_COLUMNS[column] for column in columns)
+
+        query = f'''
+            SELECT {projection}
+            FROM sequences s
+            LEFT JOIN organisms o ON s.organism_id = o.id
+            WHERE s.confidence >= ?
+        '''
+        params = [min_confidence]
+
+        if enzyme_type:
+            query += ' AND s.enzyme_type = ?'
+            params.append(enzyme_type)
+
+        if organism:
+            query += ' AND o.name LIKE ?'
+            params.append(f'%{organism}%')
+
+        if tissue:
+            query += ' AND s.tissue LIKE ?'
+            params.append(f'%{tissue}%')
+
+        query += ' ORDER BY s.confidence DESC'
+
+        if limit:
+            query += f' LIMIT {limit}'
+
+        return query, params
+
     def query_sequences(
         self,
         enzyme_type: Optional[str] = None,
@@ -294,96 +571,150 @@ class DatabaseManager:
         limit: Optional[int] = None
     ) -> List[Dict]:
         """Query sequences with filters"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+        query, params = self._sequence_query(enzyme_type, min_confidence, organism, tissue, limit)
 
-            query = '''
-                SELECT s.*, o.name as organism_name, o.family
-                FROM sequences s
-                LEFT JOIN organisms o ON s.organism_id = o.id
-                WHERE s.confidence >= ?
-            '''
-            params = [min_confidence]
-
-            if enzyme_type:
-                query += ' AND s.enzyme_type = ?'
-                params.append(enzyme_type)
-
-            if organism:
-                query += ' AND o.name LIKE ?'
-                params.append(f'%{organism}%')
-
-            if tissue:
-                query += ' AND s.tissue LIKE ?'
-                params.append(f'%{tissue}%')
-
-            query += ' ORDER BY s.confidence DESC'
-
-            if limit:
-                query += f' LIMIT {limit}'
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            cursor.execute(query, params)
+            return [dict(row) for row in cursor.fetchall()]
 
+    def query_sequences_tuples(
+        self,
+        columns: List[str],
+        enzyme_type: Optional[str] = None,
+        min_confidence: float = 0.0,
+        organism: Optional[str] = None,
+        tissue: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[tuple]:
+        """
+        Query selected sequence columns as plain tuples
+
+        Skips building a dict per row, for callers that know which
+        columns they need.
+
+        Args:
+            columns: Column names to project, in order (see SELECTABLE_COLUMNS)
+            enzyme_type: Enzyme type to match
+            min_confidence: Minimum confidence score
+            organism: Substring of the organism name
+            tissue: Substring of the tissue
+            limit: Maximum number of rows
+
+        Returns:
+            One tuple per row, in descending confidence order
+        """
+        query, params = self._sequence_query(
+            enzyme_type, min_confidence, organism, tissue, limit, columns
+        )
+
+        with self._lock:
+            cursor = self._conn.cursor()
             cursor.execute(query, params)
-            rows = cursor.fetchall()
+            return cursor.fetchall()
 
-            return [dict(row) for row in rows]
+    def iter_sequences(
+        self,
+        enzyme_type: Optional[str] = None,
+        min_confidence: float = 0.0,
+        organism: Optional[str] = None,
+        tissue: Optional[str] = None,
+        limit: Optional[int] = None,
+        batch_size: int = 1000
+    ) -> Iterator[sqlite3.Row]:
+        """
+        Stream sequences matching the filters without loading them all
+
+        The connection stays locked until the iterator is exhausted or
+        closed, so consume it promptly.
+
+        Args:
+            enzyme_type: Enzyme type to match
+            min_confidence: Minimum confidence score
+            organism: Substring of the organism name
+            tissue: Substring of the tissue
+            limit: Maximum number of rows
+            batch_size: Rows fetched from SQLite per round
+
+        Yields:
+            Rows in descending confidence order
+        """
+        query, params = self._sequence_query(enzyme_type, min_confidence, organism, tissue, limit)
+
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            cursor.arraysize = batch_size
+            cursor.execute(query, params)
+            try:
+                while True:
+                    rows = cursor.fetchmany()
+                    if not rows:
+                        break
+                    yield from rows
+            finally:
+                cursor.close()
 
     def get_statistics(self) -> Dict:
-        """Get database statistics"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-
-            stats = {}
+        """Get database statistics in a single query"""
+        with self._lock:
+            cursor = self._conn.cursor()
 
-            # Total counts
-            cursor.execute('SELECT COUNT(*) FROM sequences')
-            stats['total_sequences'] = cursor.fetchone()[0]
-
-            cursor.execute('SELECT COUNT(*) FROM organisms')
-            stats['total_organisms'] = cursor.fetchone()[0]
-
-            # Enzyme type distribution
-            cursor.execute('''
-                SELECT enzyme_type, COUNT(*) as count
-                FROM sequences
-                WHERE enzyme_type IS NOT NULL
-                GROUP BY enzyme_type
-                ORDER BY count DESC
-            ''')
-            stats['enzyme_types'] = dict(cursor.fetchall())
-
-            # Top organisms
+            # Counts and distributions are aggregated into JSON by SQLite;
+            # the average stays a separate column to keep full precision
             cursor.execute('''
-                SELECT o.name, COUNT(s.id) as count
-                FROM organisms o
-                JOIN sequences s ON o.id = s.organism_id
-                GROUP BY o.name
-                ORDER BY count DESC
-                LIMIT 10
+                SELECT json_object(
+                    'total_sequences', (SELECT COUNT(*) FROM sequences),
+                    'total_organisms', (SELECT COUNT(*) FROM organisms),
+                    'enzyme_types', (
+                        SELECT json_group_object(enzyme_type, count) FROM (
+                            SELECT enzyme_type, COUNT(*) as count
+                            FROM sequences
+                            WHERE enzyme_type IS NOT NULL
+                            GROUP BY enzyme_type
+                            ORDER BY count DESC
+                        )
+                    ),
+                    'top_organisms', (
+                        SELECT json_group_object(name, count) FROM (
+                            SELECT o.name, COUNT(s.id) as count
+                            FROM organisms o
+                            JOIN sequences s ON o.id = s.organism_id
+                            GROUP BY o.name
+                            ORDER BY count DESC
+                            LIMIT 10
+                        )
+                    )
+                ),
+                (SELECT AVG(confidence) FROM sequences)
             ''')
-            stats['top_organisms'] = dict(cursor.fetchall())
+            stats_json, avg_confidence = cursor.fetchone()
 
-            # Average confidence
-            cursor.execute('SELECT AVG(confidence) FROM sequences')
-            stats['avg_confidence'] = cursor.fetchone()[0] or 0.0
-
-            return stats
+        stats = orjson.loads(stats_json)
+        stats['avg_confidence'] = avg_confidence or 0.0
+        return stats
 
     def export_to_csv(self, output_file: str, filters: Optional[Dict] = None):
-        """Export sequences to CSV"""
+        """Export sequences to CSV, streaming rows from the database"""
         import csv
 
-        sequences = self.query_sequences(**(filters or {}))
-
+        count = 0
         with open(output_file, 'w', newline='') as f:
-            if not sequences:
+            rows = self.iter_sequences(**(filters or {}))
+            first = next(rows, None)
+            if first is None:
                 return
 
-            writer = csv.DictWriter(f, fieldnames=sequences[0].keys())
-            writer.writeheader()
-            writer.writerows(sequences)
+            writer = csv.writer(f)
+            writer.writerow(first.keys())
+            writer.writerow(first)
+            count = 1
+            for row in rows:
+                writer.writerow(row)
+                count += 1
 
-        logger.info(f"Exported {len(sequences)} sequences to {output_file}")
+        logger.info(f"Exported {count} sequences to {output_file}")
 
 
 def create_database_manager() -> DatabaseManager:
@@ -393,10 +724,9 @@ def create_database_manager() -> DatabaseManager:
 
 if __name__ == "__main__":
     # Test the database
-    db = create_database_manager()
-
-    # Get statistics
-    stats = db.get_statistics()
+    with create_database_manager() as db:
+        # Get statistics
+        stats = db.get_statistics()
     print("Database Statistics:")
     print(f"  Total sequences: {stats['total_sequences']}")
     print(f"  Total organisms: {stats['total_organisms']}")
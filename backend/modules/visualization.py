@@ -5,63 +5,297 @@ Generate charts and plots for enzyme data analysis
 import matplotlib.pyplot as plt
 import matplotlib
 matplotlib.use('Agg')  # Non-interactive backend
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+import hashlib
 import logging
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
-from ..config import CHART_COLORS, RESULTS_DIR
+from ..config import (
+    CHART_COLORS, DASHBOARD_DPI, HEATMAP_ANNOTATE_MAX_CELLS, PLOT_DPI, PNG_COMPRESS_LEVEL,
+    RESULTS_DIR, ensure_dirs
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Plot workers are started from a clean server process rather than forked:
+# the pipeline renders while export threads are running, and forking a
+# multi-threaded process can deadlock the child
+_PLOT_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+def _counts(column: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Count each value present in a column with NumPy
+
+    Categorical columns are counted with a bincount over their codes,
+    anything else with np.unique; missing values and values with no rows
+    are skipped.
+
+    Args:
+        column: Matrix column
+
+    Returns:
+        Tuple of (labels, counts) arrays, most common first (ties in
+        order of first appearance)
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        # Categories follow the configured vocabulary, not the rows, so
+        # ties are broken by each code's first row
+        codes = column.cat.codes.to_numpy()
+        present, first = np.unique(codes, return_index=True)
+        keep = present >= 0
+        present, first = present[keep], first[keep]
+        counts = np.bincount(codes[codes >= 0], minlength=len(column.cat.categories))[present]
+        order = np.lexsort((first, -counts))
+        return column.cat.categories.to_numpy()[present[order]], counts[order]
+
+    labels, first, counts = np.unique(column.dropna().to_numpy(), return_index=True, return_counts=True)
+    order = np.lexsort((first, -counts))
+    return labels[order], counts[order]
+
+
+def _gh_family_counts(matrix_df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Count non-empty GH/AA families"""
+    # Count every family and drop the empty label afterwards, rather than
+    # masking and copying the column first
+    labels, counts = _counts(matrix_df["GH/AA Family"])
+    keep = labels != ""
+    return labels[keep], counts[keep]
+
+
+def _tissue_stage_counts(matrix_df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Count rows per tissue and developmental stage with one bincount
+
+    Args:
+        matrix_df: Enzyme matrix DataFrame
+
+    Returns:
+        Tuple of (tissue_labels, stage_labels, counts), counts shaped
+        (tissues, stages). Like pd.crosstab, rows missing either value are
+        skipped and only tissues and stages with rows are kept, in
+        category order (sorted for plain columns).
+    """
+    tissue = pd.Categorical(matrix_df["Tissue"])
+    stage = pd.Categorical(matrix_df["Stage"])
+    n_tissues, n_stages = len(tissue.categories), len(stage.categories)
+
+    tissue_codes = tissue.codes.astype(np.intp)
+    stage_codes = stage.codes.astype(np.intp)
+    valid = (tissue_codes >= 0) & (stage_codes >= 0)
+    flat = tissue_codes[valid] * n_stages + stage_codes[valid]
+    counts = np.bincount(flat, minlength=n_tissues * n_stages).reshape(n_tissues, n_stages)
+
+    rows = counts.any(axis=1)
+    cols = counts.any(axis=0)
+    return (
+        tissue.categories.to_numpy()[rows],
+        stage.categories.to_numpy()[cols],
+        counts[np.ix_(rows, cols)]
+    )
+
+
+def _histogram(column: pd.Series, bins: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Bin a numeric column as ax.hist would, skipping missing values"""
+    values = column.to_numpy(dtype=float)
+    return np.histogram(values[~np.isnan(values)], bins=bins)
+
+
+# Bins of the confidence histograms on their own and on the dashboard
+CONFIDENCE_BINS = 20
+DASHBOARD_CONFIDENCE_BINS = 15
+
+# Statistics shared by several plots, computed once per matrix
+PLOT_STATS = {
+    "enzyme": lambda df: _counts(df["Enzyme"]),
+    "organism": lambda df: _counts(df["Organism"]),
+    "tissue": lambda df: _counts(df["Tissue"]),
+    "gh": _gh_family_counts,
+    "conf_mean": lambda df: float(df["Confidence"].mean()),
+    "conf_hist": lambda df: _histogram(df["Confidence"], CONFIDENCE_BINS),
+    "conf_dashboard_hist": lambda df: _histogram(df["Confidence"], DASHBOARD_CONFIDENCE_BINS),
+    "tissue_stage": _tissue_stage_counts
+}
+
+
+DASHBOARD_FILE = "summary_dashboard.png"
+# Matrix columns drawn on the summary dashboard
+DASHBOARD_COLUMNS = ["Enzyme", "Confidence", "Organism", "Tissue"]
+
 
 class EnzymeVisualizer:
     """Create visualizations for enzyme discovery data"""
 
-    def __init__(self, output_dir: str = RESULTS_DIR):
+    def __init__(
+        self,
+        output_dir: str = RESULTS_DIR,
+        dpi: int = PLOT_DPI,
+        dashboard_dpi: int = DASHBOARD_DPI,
+        use_cache: bool = True,
+        annotate_threshold: int = HEATMAP_ANNOTATE_MAX_CELLS
+    ):
         self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        ensure_dirs(str(self.output_dir))
         self.colors = CHART_COLORS
+        self.dpi = dpi
+        self.dashboard_dpi = dashboard_dpi
+        self.use_cache = use_cache
+        self.annotate_threshold = annotate_threshold
+        # Last rendering of each plot, keyed by a hash of its inputs
+        self.cache_dir = self.output_dir / ".plot_cache"
+        if use_cache:
+            ensure_dirs(str(self.cache_dir))
+        # One figure shared by every plot, created on first use
+        self._fig = None
+
+    def __getstate__(self):
+        # Worker processes draw on a figure of their own
+        state = self.__dict__.copy()
+        state["_fig"] = None
+        return state
+
+    def close(self):
+        """Release the shared figure"""
+        if self._fig is not None:
+            plt.close(self._fig)
+            self._fig = None
+
+    def _figure(self, figsize: Tuple[float, float]):
+        """
+        Clear the shared figure for the next plot
+
+        Args:
+            figsize: Figure size in inches
+
+        Returns:
+            The cleared figure
+        """
+        if self._fig is None:
+            self._fig = plt.figure()
+        self._fig.clf()
+        self._fig.set_size_inches(*figsize)
+        return self._fig
+
+    def _save(self, output_file, dpi: int):
+        """
+        Save the shared figure as a PNG with fast compression
+
+        Args:
+            output_file: Output path
+            dpi: Resolution to render at
+        """
+        self._fig.savefig(output_file, dpi=dpi, pil_kwargs={"compress_level": PNG_COMPRESS_LEVEL})
+
+    def _cache_key(self, matrix_df: pd.DataFrame, filename: str, columns: List[str], dpi: int) -> str:
+        """
+        Hash the inputs that determine a rendered plot
+
+        Args:
+            matrix_df: Enzyme matrix DataFrame
+            filename: Plot file name
+            columns: Matrix columns the plot is drawn from
+            dpi: Resolution the plot is rendered at
+
+        Returns:
+            Hex digest over the column values and rendering settings
+        """
+        settings = f"{filename}:{dpi}:{PNG_COMPRESS_LEVEL}:{self.annotate_threshold}:{matplotlib.__version__}:{sorted(self.colors.items())}"
+        digest = hashlib.blake2b(settings.encode(), digest_size=16)
+        digest.update(pd.util.hash_pandas_object(matrix_df[columns], index=False).values.tobytes())
+        return digest.hexdigest()
+
+    def _restore_cached(self, filename: str, key: str) -> bool:
+        """Copy a cached rendering to the output directory, if there is one"""
+        if not self.use_cache:
+            return False
+
+        cached = self.cache_dir / f"{key}_{filename}"
+        if not cached.exists():
+            return False
+
+        shutil.copyfile(cached, self.output_dir / filename)
+        logger.info(f"Reused cached {filename}")
+        return True
+
+    def _store_cached(self, filename: str, key: str):
+        """Keep a fresh rendering as the plot's only cache entry"""
+        output_file = self.output_dir / filename
+        # A plot with nothing to draw writes no file
+        if not self.use_cache or not output_file.exists():
+            return
+
+        for stale in self.cache_dir.glob(f"*_{filename}"):
+            stale.unlink()
+        shutil.copyfile(output_file, self.cache_dir / f"{key}_{filename}")
+
+    def _precompute(self, matrix_df: pd.DataFrame) -> Dict:
+        """
+        Compute the counts and means used across the plots in one pass
+
+        Args:
+            matrix_df: Enzyme matrix DataFrame
+
+        Returns:
+            Dictionary of statistics keyed as in PLOT_STATS
+        """
+        return {name: compute(matrix_df) for name, compute in PLOT_STATS.items()}
+
+    def _stat(self, stats: Optional[Dict], name: str, matrix_df: pd.DataFrame):
+        """Look up a precomputed statistic, computing it when not given"""
+        if stats is not None and name in stats:
+            return stats[name]
+        return PLOT_STATS[name](matrix_df)
 
     def plot_enzyme_distribution(
         self,
         matrix_df: pd.DataFrame,
-        output_file: Optional[str] = None
+        output_file: Optional[str] = None,
+        stats: Optional[Dict] = None
     ):
         """Plot enzyme type distribution"""
-        plt.figure(figsize=(12, 6))
+        fig = self._figure((12, 6))
+        ax = fig.add_subplot(111)
 
-        enzyme_counts = matrix_df["Enzyme"].value_counts()
+        enzyme_labels, enzyme_counts = self._stat(stats, "enzyme", matrix_df)
 
-        plt.bar(
+        ax.bar(
             range(len(enzyme_counts)),
-            enzyme_counts.values,
+            enzyme_counts,
             color=self.colors["primary"]
         )
-        plt.xticks(range(len(enzyme_counts)), enzyme_counts.index, rotation=45, ha='right')
-        plt.xlabel("Enzyme Type")
-        plt.ylabel("Count")
-        plt.title("Enzyme Type Distribution")
-        plt.tight_layout()
+        ax.set_xticks(range(len(enzyme_counts)), enzyme_labels, rotation=45, ha='right')
+        ax.set_xlabel("Enzyme Type")
+        ax.set_ylabel("Count")
+        ax.set_title("Enzyme Type Distribution")
+        fig.tight_layout()
 
         if output_file is None:
             output_file = self.output_dir / "enzyme_distribution.png"
 
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
-        plt.close()
+        self._save(output_file, self.dpi)
 
         logger.info(f"Saved enzyme distribution plot to {output_file}")
 
     def plot_organism_distribution(
         self,
         matrix_df: pd.DataFrame,
-        output_file: Optional[str] = None
+        output_file: Optional[str] = None,
+        stats: Optional[Dict] = None
     ):
         """Plot organism distribution pie chart"""
-        plt.figure(figsize=(10, 8))
+        fig = self._figure((10, 8))
+        ax = fig.add_subplot(111)
 
-        organism_counts = matrix_df["Organism"].value_counts()
+        organism_labels, organism_counts = self._stat(stats, "organism", matrix_df)
 
         colors_list = [
             self.colors["primary"],
@@ -71,149 +305,160 @@ class EnzymeVisualizer:
             "#D4AE6A"
         ]
 
-        plt.pie(
-            organism_counts.values,
-            labels=organism_counts.index,
+        ax.pie(
+            organism_counts,
+            labels=organism_labels,
             autopct='%1.1f%%',
             colors=colors_list[:len(organism_counts)],
             startangle=90
         )
-        plt.title("Organism Distribution")
-        plt.axis('equal')
+        ax.set_title("Organism Distribution")
+        ax.axis('equal')
+        fig.tight_layout()
 
         if output_file is None:
             output_file = self.output_dir / "organism_distribution.png"
 
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
-        plt.close()
+        self._save(output_file, self.dpi)
 
         logger.info(f"Saved organism distribution plot to {output_file}")
 
     def plot_confidence_histogram(
         self,
         matrix_df: pd.DataFrame,
-        output_file: Optional[str] = None
+        output_file: Optional[str] = None,
+        stats: Optional[Dict] = None
     ):
         """Plot confidence score distribution"""
-        plt.figure(figsize=(10, 6))
-
-        plt.hist(
-            matrix_df["Confidence"],
-            bins=20,
+        fig = self._figure((10, 6))
+        ax = fig.add_subplot(111)
+
+        # Binned once in the shared statistics; each bin's left edge is
+        # weighted by its count so the bars come out as ax.hist draws them
+        counts, edges = self._stat(stats, "conf_hist", matrix_df)
+        ax.hist(
+            edges[:-1],
+            bins=edges,
+            weights=counts,
             color=self.colors["primary"],
             edgecolor='white',
             alpha=0.7
         )
-        plt.xlabel("Confidence Score")
-        plt.ylabel("Frequency")
-        plt.title("Confidence Score Distribution")
-        plt.axvline(
-            matrix_df["Confidence"].mean(),
+        ax.set_xlabel("Confidence Score")
+        ax.set_ylabel("Frequency")
+        ax.set_title("Confidence Score Distribution")
+        conf_mean = self._stat(stats, "conf_mean", matrix_df)
+        ax.axvline(
+            conf_mean,
             color='red',
             linestyle='--',
-            label=f'Mean: {matrix_df["Confidence"].mean():.2f}'
+            label=f'Mean: {conf_mean:.2f}'
         )
-        plt.legend()
-        plt.tight_layout()
+        ax.legend()
+        fig.tight_layout()
 
         if output_file is None:
             output_file = self.output_dir / "confidence_histogram.png"
 
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
-        plt.close()
+        self._save(output_file, self.dpi)
 
         logger.info(f"Saved confidence histogram to {output_file}")
 
     def plot_gh_family_distribution(
         self,
         matrix_df: pd.DataFrame,
-        output_file: Optional[str] = None
+        output_file: Optional[str] = None,
+        stats: Optional[Dict] = None
     ):
         """Plot GH/AA family distribution"""
-        plt.figure(figsize=(12, 6))
-
-        gh_data = matrix_df[matrix_df["GH/AA Family"] != ""]
-        if len(gh_data) == 0:
+        gh_labels, gh_counts = self._stat(stats, "gh", matrix_df)
+        if len(gh_counts) == 0:
             logger.warning("No GH/AA family data to plot")
             return
 
-        gh_counts = gh_data["GH/AA Family"].value_counts()
+        fig = self._figure((12, 6))
+        ax = fig.add_subplot(111)
 
-        plt.barh(
+        ax.barh(
             range(len(gh_counts)),
-            gh_counts.values,
+            gh_counts,
             color=self.colors["secondary"]
         )
-        plt.yticks(range(len(gh_counts)), gh_counts.index)
-        plt.xlabel("Count")
-        plt.ylabel("GH/AA Family")
-        plt.title("Glycoside Hydrolase / Auxiliary Activity Family Distribution")
-        plt.tight_layout()
+        ax.set_yticks(range(len(gh_counts)), gh_labels)
+        ax.set_xlabel("Count")
+        ax.set_ylabel("GH/AA Family")
+        ax.set_title("Glycoside Hydrolase / Auxiliary Activity Family Distribution")
+        fig.tight_layout()
 
         if output_file is None:
             output_file = self.output_dir / "gh_family_distribution.png"
 
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
-        plt.close()
+        self._save(output_file, self.dpi)
 
         logger.info(f"Saved GH family distribution plot to {output_file}")
 
     def plot_tissue_stage_heatmap(
         self,
         matrix_df: pd.DataFrame,
-        output_file: Optional[str] = None
+        output_file: Optional[str] = None,
+        stats: Optional[Dict] = None
     ):
         """Plot heatmap of tissue x developmental stage"""
-        plt.figure(figsize=(10, 8))
+        fig = self._figure((10, 8))
+        ax = fig.add_subplot(111)
 
-        # Create pivot table
-        pivot = pd.crosstab(matrix_df["Tissue"], matrix_df["Stage"])
+        tissue_labels, stage_labels, values = self._stat(stats, "tissue_stage", matrix_df)
 
-        plt.imshow(pivot.values, cmap='YlGn', aspect='auto')
-        plt.colorbar(label='Count')
+        image = ax.imshow(values, cmap='YlGn', aspect='auto')
+        fig.colorbar(image, ax=ax, label='Count')
 
-        plt.xticks(range(len(pivot.columns)), pivot.columns, rotation=45, ha='right')
-        plt.yticks(range(len(pivot.index)), pivot.index)
+        ax.set_xticks(range(len(stage_labels)), stage_labels, rotation=45, ha='right')
+        ax.set_yticks(range(len(tissue_labels)), tissue_labels)
 
-        plt.xlabel("Developmental Stage")
-        plt.ylabel("Tissue")
-        plt.title("Tissue × Developmental Stage Distribution")
+        ax.set_xlabel("Developmental Stage")
+        ax.set_ylabel("Tissue")
+        ax.set_title("Tissue × Developmental Stage Distribution")
 
-        # Add value annotations
-        for i in range(len(pivot.index)):
-            for j in range(len(pivot.columns)):
-                plt.text(j, i, str(pivot.values[i, j]),
-                        ha='center', va='center', color='black')
+        # Add value annotations, with the labels formatted by NumPy in one
+        # pass. Past the threshold the Text artists would dominate draw time
+        # and be too small to read, so large heatmaps go without.
+        if values.size <= self.annotate_threshold:
+            labels = np.char.mod('%d', values)
+            rows, cols = np.indices(values.shape)
+            for i, j, label in zip(rows.ravel().tolist(), cols.ravel().tolist(), labels.ravel().tolist()):
+                ax.text(j, i, label, ha='center', va='center', color='black')
 
-        plt.tight_layout()
+        fig.tight_layout()
 
         if output_file is None:
             output_file = self.output_dir / "tissue_stage_heatmap.png"
 
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
-        plt.close()
+        self._save(output_file, self.dpi)
 
         logger.info(f"Saved tissue-stage heatmap to {output_file}")
 
-    def create_summary_dashboard(self, matrix_df: pd.DataFrame):
+    def create_summary_dashboard(self, matrix_df: pd.DataFrame, stats: Optional[Dict] = None):
         """Create comprehensive summary dashboard"""
-        fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+        fig = self._figure((16, 12))
+        axes = fig.subplots(2, 2)
         fig.suptitle("EAB Enzyme Discovery Dashboard", fontsize=16, fontweight='bold')
 
         # 1. Enzyme distribution
         ax1 = axes[0, 0]
-        enzyme_counts = matrix_df["Enzyme"].value_counts()
-        ax1.bar(range(len(enzyme_counts)), enzyme_counts.values, color=self.colors["primary"])
+        enzyme_labels, enzyme_counts = self._stat(stats, "enzyme", matrix_df)
+        ax1.bar(range(len(enzyme_counts)), enzyme_counts, color=self.colors["primary"])
         ax1.set_xticks(range(len(enzyme_counts)))
-        ax1.set_xticklabels(enzyme_counts.index, rotation=45, ha='right')
+        ax1.set_xticklabels(enzyme_labels, rotation=45, ha='right')
         ax1.set_title("Enzyme Type Distribution")
         ax1.set_ylabel("Count")
 
         # 2. Confidence histogram
         ax2 = axes[0, 1]
-        ax2.hist(matrix_df["Confidence"], bins=15, color=self.colors["primary"], alpha=0.7, edgecolor='white')
-        ax2.axvline(matrix_df["Confidence"].mean(), color='red', linestyle='--',
-                   label=f'Mean: {matrix_df["Confidence"].mean():.2f}')
+        counts, edges = self._stat(stats, "conf_dashboard_hist", matrix_df)
+        ax2.hist(edges[:-1], bins=edges, weights=counts, color=self.colors["primary"], alpha=0.7, edgecolor='white')
+        conf_mean = self._stat(stats, "conf_mean", matrix_df)
+        ax2.axvline(conf_mean, color='red', linestyle='--',
+                   label=f'Mean: {conf_mean:.2f}')
         ax2.set_title("Confidence Distribution")
         ax2.set_xlabel("Confidence Score")
         ax2.set_ylabel("Frequency")
@@ -221,45 +466,112 @@ class EnzymeVisualizer:
 
         # 3. Organism distribution
         ax3 = axes[1, 0]
-        organism_counts = matrix_df["Organism"].value_counts()
-        ax3.pie(organism_counts.values, labels=organism_counts.index, autopct='%1.1f%%',
+        organism_labels, organism_counts = self._stat(stats, "organism", matrix_df)
+        ax3.pie(organism_counts, labels=organism_labels, autopct='%1.1f%%',
                startangle=90)
         ax3.set_title("Organism Distribution")
 
         # 4. Tissue distribution
         ax4 = axes[1, 1]
-        tissue_counts = matrix_df["Tissue"].value_counts()
-        ax4.barh(range(len(tissue_counts)), tissue_counts.values, color=self.colors["secondary"])
+        tissue_labels, tissue_counts = self._stat(stats, "tissue", matrix_df)
+        ax4.barh(range(len(tissue_counts)), tissue_counts, color=self.colors["secondary"])
         ax4.set_yticks(range(len(tissue_counts)))
-        ax4.set_yticklabels(tissue_counts.index)
+        ax4.set_yticklabels(tissue_labels)
         ax4.set_title("Tissue Distribution")
         ax4.set_xlabel("Count")
 
-        plt.tight_layout()
+        fig.tight_layout()
 
-        output_file = self.output_dir / "summary_dashboard.png"
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
-        plt.close()
+        output_file = self.output_dir / DASHBOARD_FILE
+        self._save(output_file, self.dashboard_dpi)
 
         logger.info(f"Saved summary dashboard to {output_file}")
 
-    def generate_all_plots(self, matrix_df: pd.DataFrame):
-        """Generate all visualization plots"""
+    def generate_all_plots(self, matrix_df: pd.DataFrame, parallel: bool = True) -> List[Path]:
+        """
+        Generate all visualization plots
+
+        Plots whose input columns are unchanged since they were last
+        rendered are copied from the plot cache instead of redrawn.
+
+        Args:
+            matrix_df: Enzyme matrix DataFrame
+            parallel: Render the independent plots in separate processes
+
+        Returns:
+            Paths of the plot files in the output directory
+        """
         logger.info("Generating all visualizations...")
 
-        self.plot_enzyme_distribution(matrix_df)
-        self.plot_organism_distribution(matrix_df)
-        self.plot_confidence_histogram(matrix_df)
-        self.plot_gh_family_distribution(matrix_df)
-        self.plot_tissue_stage_heatmap(matrix_df)
-        self.create_summary_dashboard(matrix_df)
+        # Each single plot with its output file, the matrix columns its
+        # image depends on, and the columns it still reads beyond the
+        # shared statistics (workers only receive those)
+        plots = [
+            (self.plot_enzyme_distribution, "enzyme_distribution.png", ["Enzyme"], []),
+            (self.plot_organism_distribution, "organism_distribution.png", ["Organism"], []),
+            (self.plot_confidence_histogram, "confidence_histogram.png", ["Confidence"], []),
+            (self.plot_gh_family_distribution, "gh_family_distribution.png", ["GH/AA Family"], []),
+            (self.plot_tissue_stage_heatmap, "tissue_stage_heatmap.png", ["Tissue", "Stage"], [])
+        ]
+        filenames = [filename for _, filename, _, _ in plots] + [DASHBOARD_FILE]
+
+        rendered = []
+        pending = []
+        for plot, filename, key_columns, columns in plots:
+            key = self._cache_key(matrix_df, filename, key_columns, self.dpi)
+            if not self._restore_cached(filename, key):
+                pending.append((plot, columns))
+                rendered.append((filename, key))
+
+        key = self._cache_key(matrix_df, DASHBOARD_FILE, DASHBOARD_COLUMNS, self.dashboard_dpi)
+        render_dashboard = not self._restore_cached(DASHBOARD_FILE, key)
+        if render_dashboard:
+            rendered.append((DASHBOARD_FILE, key))
+
+        if not rendered:
+            logger.info(f"All visualizations unchanged in {self.output_dir}")
+            return self._existing(filenames)
+
+        # Counts shared between the single plots and the dashboard are
+        # computed once and handed to every plot
+        stats = self._precompute(matrix_df)
+
+        if parallel and pending:
+            # Rendering is CPU-bound and pyplot is not thread-safe, so each
+            # plot gets its own process
+            workers = min(len(pending), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=workers, mp_context=_PLOT_MP_CONTEXT) as executor:
+                futures = {
+                    executor.submit(plot, matrix_df[columns], stats=stats): plot.__name__
+                    for plot, columns in pending
+                }
+                # The dashboard renders here while the workers draw
+                if render_dashboard:
+                    self.create_summary_dashboard(matrix_df, stats=stats)
+                for future in as_completed(futures):
+                    future.result()
+                    logger.info(f"Finished {futures[future]}")
+        else:
+            for plot, _ in pending:
+                plot(matrix_df, stats=stats)
+            if render_dashboard:
+                self.create_summary_dashboard(matrix_df, stats=stats)
+
+        for filename, key in rendered:
+            self._store_cached(filename, key)
 
         logger.info(f"All visualizations saved to {self.output_dir}")
+        return self._existing(filenames)
+
+    def _existing(self, filenames: List[str]) -> List[Path]:
+        """Paths of the given files that exist in the output directory"""
+        paths = [self.output_dir / filename for filename in filenames]
+        return [path for path in paths if path.exists()]
 
 
-def create_visualizer(output_dir: str = RESULTS_DIR) -> EnzymeVisualizer:
+def create_visualizer(output_dir: str = RESULTS_DIR, use_cache: bool = True) -> EnzymeVisualizer:
     """Factory function to create EnzymeVisualizer instance"""
-    return EnzymeVisualizer(output_dir=output_dir)
+    return EnzymeVisualizer(output_dir=output_dir, use_cache=use_cache)
 
 
 if __name__ == "__main__":
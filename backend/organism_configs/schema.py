@@ -0,0 +1,118 @@
+"""
+Organism Profile Schema
+Loads the organism profiles (<name>.toml in this directory) into frozen
+OrganismConfig records
+"""
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, FrozenSet, List, Mapping, Tuple
+import re
+import tomllib
+
+PROFILE_DIR = Path(__file__).parent
+
+
+@dataclass(frozen=True, slots=True)
+class OrganismConfig:
+    """One organism profile, with lookups derived from its vocabularies"""
+
+    project_name: str
+    results_prefix: str
+    primary_organism: str
+    organism_family: str
+    # Ordered vocabularies; order matters for query building and for the
+    # categories of the matrix label columns
+    related_species: Tuple[str, ...]
+    tissues: Tuple[str, ...]
+    developmental_stages: Tuple[str, ...]
+    keywords: Tuple[str, ...]
+    species_common_names: Mapping[str, str] = field(default_factory=dict)
+    additional_enzymes: Mapping[str, Mapping] = field(default_factory=dict)
+    query_templates: Mapping[str, str] = field(default_factory=dict)
+    # Fungi have growth conditions in place of gut tissues
+    skip_tissue_validation: bool = False
+    use_growth_conditions: bool = False
+    notes: str = ""
+
+    # Derived in __post_init__
+    related_species_set: FrozenSet[str] = field(init=False)
+    tissue_set: FrozenSet[str] = field(init=False)
+    stage_set: FrozenSet[str] = field(init=False)
+    keyword_set: FrozenSet[str] = field(init=False)
+    tissue_pattern: re.Pattern = field(init=False)
+    keyword_pattern: re.Pattern = field(init=False)
+    categories: Mapping[str, Tuple[str, ...]] = field(init=False)
+
+    def __post_init__(self):
+        derived = {
+            "species_common_names": MappingProxyType(dict(self.species_common_names)),
+            "additional_enzymes": MappingProxyType(dict(self.additional_enzymes)),
+            "query_templates": MappingProxyType(dict(self.query_templates)),
+            "related_species_set": frozenset(self.related_species),
+            "tissue_set": frozenset(self.tissues),
+            "stage_set": frozenset(self.developmental_stages),
+            "keyword_set": frozenset(self.keywords),
+            # Tissues match as substrings ("midgut" also matches "gut"), as in
+            # the main config; keywords match whole words only, so short
+            # acronyms like "VP" do not fire inside other words
+            "tissue_pattern": re.compile("|".join(map(re.escape, self.tissues)), re.IGNORECASE),
+            "keyword_pattern": re.compile(
+                r"\b(?:" + "|".join(map(re.escape, self.keywords)) + r")\b", re.IGNORECASE
+            ),
+            # Closed vocabularies of the matrix label columns
+            "categories": MappingProxyType({
+                "Organism": self.related_species,
+                "Tissue": self.tissues,
+                "Stage": self.developmental_stages
+            })
+        }
+        for name, value in derived.items():
+            object.__setattr__(self, name, value)
+
+
+def list_organism_configs() -> List[str]:
+    """Names of the profiles available to load_organism_config()"""
+    return sorted(path.stem for path in PROFILE_DIR.glob("*.toml"))
+
+
+@lru_cache(maxsize=None)
+def load_organism_config(name: str) -> OrganismConfig:
+    """
+    Load an organism profile
+
+    Args:
+        name: Profile name, e.g. "termite" for termite.toml
+
+    Returns:
+        Frozen OrganismConfig, shared between callers
+    """
+    with open(PROFILE_DIR / f"{name}.toml", "rb") as f:
+        data: Dict = tomllib.load(f)
+
+    # Profiles without their own keyword list search for the keywords of
+    # their additional enzyme families
+    keywords = data.pop("keywords", None)
+    if keywords is None:
+        keywords = [
+            keyword
+            for enzyme in data.get("additional_enzymes", {}).values()
+            for keyword in enzyme["keywords"]
+        ]
+
+    return OrganismConfig(
+        related_species=tuple(data.pop("related_species")),
+        tissues=tuple(data.pop("tissues")),
+        developmental_stages=tuple(data.pop("developmental_stages")),
+        keywords=tuple(keywords),
+        **data
+    )
+
+
+if __name__ == "__main__":
+    # Test loading every profile
+    for profile_name in list_organism_configs():
+        config = load_organism_config(profile_name)
+        print(f"{profile_name}: {config.primary_organism} "
+              f"({len(config.related_species)} species, {len(config.keywords)} keywords)")
@@ -0,0 +1,11 @@
+"""
+Test configuration
+Puts the repository root on sys.path so the backend package imports as
+backend.modules.<name>
+"""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
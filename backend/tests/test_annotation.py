@@ -0,0 +1,75 @@
+"""
+Tests for the enzyme annotation module
+"""
+import random
+import re
+
+import pytest
+
+from backend.modules.annotation import create_annotator
+
+# The two patterns the combined GH/EC scan replaced
+GH_PATTERN = re.compile(r'\b(gh\d+|aa\d+|ce\d+|pl\d+)\b')
+EC_PATTERN = re.compile(r'\b(\d+\.\d+\.\d+\.\d+)\b')
+
+TOKENS = [
+    "gh5", "GH11", "aa9", "ce1", "pl7", "gh", "xgh5", "gh5x", "gh5.1",
+    "3.2.1.4", "3.2.1", "1.2.3.4.5", "10.11.12.13", "ec3.2.1.4", "3.2.1.4a",
+    "cellulase", "endo-1,4-beta-glucanase", "-", ".", ",", "(", ")", "_", "/"
+]
+
+
+def _random_text(rng: random.Random) -> str:
+    """Join random tokens with random separators, including none"""
+    parts = []
+    for _ in range(rng.randint(0, 12)):
+        parts.append(rng.choice(TOKENS))
+        parts.append(rng.choice([" ", "", "-", ".", ";", "\n"]))
+    return "".join(parts)
+
+
+def _separate_scans(text: str):
+    text = text.lower()
+    gh_families = sorted(set(gh.upper() for gh in GH_PATTERN.findall(text)))
+    ec_numbers = sorted(set(EC_PATTERN.findall(text)))
+    return gh_families, ec_numbers
+
+
+@pytest.fixture(scope="module")
+def annotator():
+    return create_annotator()
+
+
+@pytest.mark.parametrize("text", [
+    "Glycoside hydrolase family GH5 (EC 3.2.1.4)",
+    "GH11 xylanase, EC 3.2.1.8; CBM1 AA9 lytic monooxygenase",
+    "EC 3.2.1.4/3.2.1.91 gh5_2 CE1 PL7",
+    "1.2.3.4.5 gh5.1 ec3.2.1.4",
+    ""
+])
+def test_combined_scan_matches_separate_scans(annotator, text):
+    classification = annotator.classify_enzyme({"description": text}, score=False)
+
+    gh_families, ec_numbers = _separate_scans(text)
+    assert sorted(classification["gh_families"]) == gh_families
+    assert sorted(classification["ec_numbers"]) == ec_numbers
+
+
+def test_combined_scan_matches_separate_scans_on_random_text(annotator):
+    rng = random.Random(0)
+    for _ in range(2000):
+        text = _random_text(rng)
+        classification = annotator.classify_enzyme({"description": text}, score=False)
+
+        gh_families, ec_numbers = _separate_scans(text)
+        assert sorted(classification["gh_families"]) == gh_families, text
+        assert sorted(classification["ec_numbers"]) == ec_numbers, text
+
+
+def test_record_ec_number_is_kept(annotator):
+    classification = annotator.classify_enzyme(
+        {"description": "GH5 cellulase", "ec_number": "3.2.1.4"}, score=False
+    )
+
+    assert classification["gh_families"] == ["GH5"]
+    assert classification["ec_numbers"] == ["3.2.1.4"]
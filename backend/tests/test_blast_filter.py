@@ -0,0 +1,66 @@
+"""
+Tests for the BLAST filter module
+"""
+import threading
+import time
+from io import StringIO
+
+import pytest
+
+from backend.modules import blast_filter
+from backend.modules.blast_filter import BLASTFilter
+from backend.modules.rate_limit import RateLimiter
+
+SEQUENCE = "MKLV" * 30
+INTERVAL = 0.2
+
+
+@pytest.fixture
+def submissions(monkeypatch):
+    """Record the start time of every qblast call, answering with no hits"""
+    times = []
+    lock = threading.Lock()
+
+    def qblast(**kwargs):
+        with lock:
+            times.append(time.monotonic())
+        return StringIO("")
+
+    monkeypatch.setattr(blast_filter.NCBIWWW, "qblast", qblast)
+    return times
+
+
+@pytest.fixture
+def blast():
+    blast = BLASTFilter(use_cache=False)
+    blast.submit_limiter = RateLimiter(rate=1.0 / INTERVAL)
+    return blast
+
+
+def test_remote_submissions_are_spaced_across_threads(blast, submissions):
+    sequences = [{"sequence": SEQUENCE + "A" * i, "confidence": 0.5} for i in range(3)]
+
+    blast.annotate_with_blast(sequences, max_workers=3)
+
+    assert len(submissions) == 3
+    starts = sorted(submissions)
+    gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+    assert min(gaps) >= INTERVAL * 0.9
+
+
+def test_skipped_searches_do_not_take_a_submission_slot(blast, submissions):
+    blast.cache = {blast_filter.ncbi_cache_key("qblast", {
+        "program": "blastp",
+        "database": "nr",
+        "sequence": SEQUENCE,
+        "entrez_query": "",
+        "expect": blast.evalue_threshold * 10,
+        "hitlist_size": 50
+    }): ""}
+    sequences = [{"sequence": "MKLV"}, {"sequence": SEQUENCE}]
+
+    start = time.monotonic()
+    blast.annotate_with_blast(sequences * 3)
+
+    assert submissions == []
+    assert time.monotonic() - start < INTERVAL
@@ -0,0 +1,56 @@
+"""
+Tests for the digestive matrix builder
+"""
+import pytest
+
+from backend.modules.matrix_builder import create_matrix_builder
+
+
+def _sequence(accession: str, confidence: float, tissue: str = "midgut") -> dict:
+    return {
+        "accession": accession,
+        "enzyme_type": "cellulase",
+        "gh_family": "GH5",
+        "protein_name": "endo-beta-1,4-glucanase",
+        "organism": "Agrilus planipennis",
+        "tissue": tissue,
+        "stage": "larval",
+        "length": 120,
+        "confidence": confidence
+    }
+
+
+@pytest.fixture
+def builder():
+    return create_matrix_builder()
+
+
+@pytest.fixture
+def matrix(builder):
+    return builder.build_matrix(
+        [_sequence("XP_000001", 0.9), _sequence("XP_000002", 0.6, tissue="fat body")],
+        min_confidence=0.5
+    )
+
+
+def test_summary_follows_in_place_changes(builder, matrix):
+    assert builder.generate_summary(matrix)["high_confidence_count"] == 1
+
+    matrix.loc[:, "Confidence"] = 0.95
+
+    assert builder.generate_summary(matrix)["high_confidence_count"] == 2
+
+
+def test_clusters_follow_in_place_changes(builder, matrix):
+    assert builder.identify_enzyme_clusters(matrix)["Cellulose Degradation"] == ["XP_000001", "XP_000002"]
+
+    matrix.loc[:, "Gene ID"] = ["XP_000003", "XP_000004"]
+
+    assert builder.identify_enzyme_clusters(matrix)["Cellulose Degradation"] == ["XP_000003", "XP_000004"]
+
+
+def test_report_with_precomputed_summary(builder, matrix, tmp_path):
+    builder.generate_report(matrix, tmp_path / "computed.txt")
+    builder.generate_report(matrix, tmp_path / "passed.txt", summary=builder.generate_summary(matrix))
+
+    assert (tmp_path / "passed.txt").read_text() == (tmp_path / "computed.txt").read_text()
@@ -0,0 +1,114 @@
+"""
+Tests for the sequence retrieval module
+"""
+import io
+
+import pytest
+import requests
+import urllib3
+
+from backend.modules import retrieve_sequences
+from backend.modules.retrieve_sequences import HistoryExpiredError, create_retriever
+
+GENBANK_RECORD = """\
+LOCUS       XP_018329512             120 aa            linear   INV 20-JUL-2016
+DEFINITION  endoglucanase [Agrilus planipennis].
+ACCESSION   XP_018329512
+VERSION     XP_018329512.1
+DBSOURCE    REFSEQ: accession XM_018474010.1
+KEYWORDS    RefSeq.
+SOURCE      Agrilus planipennis (emerald ash borer)
+  ORGANISM  Agrilus planipennis
+            Eukaryota; Metazoa; Arthropoda; Hexapoda; Insecta; Pterygota;
+            Neoptera; Endopterygota; Coleoptera; Polyphaga; Elateriformia;
+            Buprestoidea; Buprestidae; Agrilinae; Agrilus.
+FEATURES             Location/Qualifiers
+     source          1..120
+                     /organism="Agrilus planipennis"
+                     /db_xref="taxon:224129"
+     Protein         1..120
+                     /product="endoglucanase"
+ORIGIN
+        1 mklvmklvmk lvmklvmklv mklvmklvmk lvmklvmklv mklvmklvmk lvmklvmklv
+       61 mklvmklvmk lvmklvmklv mklvmklvmk lvmklvmklv mklvmklvmk lvmklvmklv
+//
+"""
+
+HISTORY_ERROR = b"""\
+<?xml version="1.0" encoding="UTF-8" ?>
+<!DOCTYPE eFetchResult PUBLIC "-//NLM//DTD efetch 20131226//EN" "https://eutils.ncbi.nlm.nih.gov/eutils/dtd/20131226/efetch.dtd">
+<eFetchResult>
+\t<ERROR>Cannot retrieve query from history</ERROR>
+</eFetchResult>
+"""
+
+
+class FakeResponse:
+    """Streamed requests.Response stand-in over a fixed body"""
+
+    def __init__(self, body: bytes, status: int = 200):
+        self.status_code = status
+        self.raw = urllib3.HTTPResponse(body=io.BytesIO(body), status=status, preload_content=False)
+
+    @property
+    def content(self) -> bytes:
+        return self.raw.read()
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error")
+
+    def close(self):
+        self.raw.release_conn()
+
+
+class FakeSession:
+    """Session answering every request with the same body"""
+
+    def __init__(self, body: bytes, status: int = 200):
+        self.body = body
+        self.status = status
+        self.requests = []
+
+    def get(self, url, params=None, **kwargs):
+        self.requests.append(params)
+        return FakeResponse(self.body, self.status)
+
+
+@pytest.fixture
+def make_retriever(tmp_path, monkeypatch):
+    monkeypatch.setattr(retrieve_sequences, "CACHE_DIR", str(tmp_path))
+
+    def make(session):
+        retriever = create_retriever(session=session)
+        retriever._rate_limit_wait = lambda: None
+        return retriever
+
+    return make
+
+
+def test_history_records_are_cached_under_requested_id_forms(make_retriever):
+    session = FakeSession(GENBANK_RECORD.encode())
+    retriever = make_retriever(session)
+
+    records = retriever.fetch_genbank_history("protein", "WEBENV", "1", retmax=1)
+
+    assert [record["accession"] for record in records] == ["XP_018329512.1"]
+    # Both forms resolve from the cache without another request
+    found = retriever.retrieve_batch("protein", ["XP_018329512", "XP_018329512.1"])
+    assert [record["accession"] for record in found] == ["XP_018329512.1", "XP_018329512.1"]
+    assert len(session.requests) == 1
+
+
+def test_history_error_body_raises(make_retriever):
+    retriever = make_retriever(FakeSession(HISTORY_ERROR))
+
+    with pytest.raises(HistoryExpiredError, match="Cannot retrieve query from history"):
+        retriever.fetch_genbank_history("protein", "EXPIRED", "1", retmax=10)
+
+
+def test_history_http_error_raises(make_retriever):
+    retriever = make_retriever(FakeSession(b"", status=400))
+
+    with pytest.raises(requests.HTTPError):
+        retriever.fetch_genbank_history("protein", "WEBENV", "1", retmax=10)
@@ -0,0 +1,102 @@
+"""
+Tests for the NCBI search module
+"""
+import asyncio
+
+import orjson
+import pytest
+
+from backend.modules.search_ncbi import create_searcher
+
+
+class FakeResponse:
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    """Session answering esearch requests with a new WebEnv each time"""
+
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url, params=None, **kwargs):
+        self.requests.append(params)
+        retmax = int(params["retmax"])
+        return FakeResponse(orjson.dumps({"esearchresult": {
+            "count": "3",
+            "idlist": ["1", "2", "3"][:retmax],
+            "webenv": f"WEBENV_{len(self.requests)}",
+            "querykey": "1"
+        }}))
+
+
+class FakeCache(dict):
+    """In-memory stand-in for the diskcache response cache"""
+
+    def set(self, key, value, expire=None, tag=None):
+        self[key] = value
+
+    def evict(self, tag):
+        self.clear()
+
+
+@pytest.fixture
+def session():
+    return FakeSession()
+
+
+@pytest.fixture
+def searcher(session):
+    searcher = create_searcher(session=session, use_cache=False)
+    searcher.cache = FakeCache()
+    return searcher
+
+
+def test_id_searches_are_served_from_memo(searcher, session):
+    first = searcher.search_database("protein", "cellulase")
+    second = searcher.search_database("protein", "cellulase")
+
+    assert first == second
+    assert first["id_list"] == ["1", "2", "3"]
+    assert len(session.requests) == 1
+
+
+def test_id_searches_are_served_from_response_cache(searcher, session):
+    searcher.search_database("protein", "cellulase")
+    searcher._results.clear()
+
+    assert searcher.search_database("protein", "cellulase")["webenv"] == "WEBENV_1"
+    assert len(session.requests) == 1
+
+
+def test_history_searches_skip_memo_and_response_cache(searcher, session):
+    first = searcher.search_database("protein", "cellulase", fetch_ids=False)
+    second = searcher.search_database("protein", "cellulase", fetch_ids=False)
+
+    assert first["id_list"] == []
+    assert (first["webenv"], second["webenv"]) == ("WEBENV_1", "WEBENV_2")
+    assert len(session.requests) == 2
+    assert not searcher._results
+    assert not searcher.cache
+
+
+def test_sync_search_works_under_running_loop(searcher, session):
+    async def caller():
+        return searcher.search_database("protein", "cellulase")
+
+    assert asyncio.run(caller())["id_list"] == ["1", "2", "3"]
+    assert len(session.requests) == 1
+
+
+def test_comprehensive_search_includes_transcriptomes(searcher, session):
+    results = searcher.comprehensive_search(databases=["sra"])
+
+    assert results["sra_transcriptomes"][0]["database"] == "sra"
+    assert results["sra_transcriptomes"][0]["count"] == 3
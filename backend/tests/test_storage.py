@@ -0,0 +1,71 @@
+"""
+Tests for the SQLite storage module
+"""
+import sqlite3
+
+import pytest
+
+from backend.modules.storage import DatabaseManager
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "enzymes.db")
+
+
+def _legacy_database(db_path: str):
+    """Create a database as it was before organisms were unique by name"""
+    DatabaseManager(db_path).close()
+
+    conn = sqlite3.connect(db_path)
+    conn.execute('DROP INDEX idx_organisms_name')
+    conn.executemany(
+        'INSERT INTO organisms (id, taxid, name, family, taxonomy) VALUES (?, ?, ?, ?, ?)',
+        [
+            (1, None, "Agrilus planipennis", None, None),
+            (2, "224129", "Agrilus planipennis", "Buprestidae", '["Insecta"]'),
+            (3, None, "Agrilus anxius", None, None),
+            (4, None, "Agrilus planipennis", None, None)
+        ]
+    )
+    conn.executemany(
+        'INSERT INTO sequences (accession, source_db, organism_id) VALUES (?, ?, ?)',
+        [("XP_000001", "protein", 1), ("XP_000002", "protein", 2), ("XP_000003", "protein", 4)]
+    )
+    conn.execute("INSERT INTO bioprojects (bioproject_id, organism_id) VALUES ('PRJNA1', 2)")
+    conn.execute("INSERT INTO sra_runs (sra_id, organism_id) VALUES ('SRR1', 4)")
+    conn.commit()
+    conn.close()
+
+
+def test_duplicate_organisms_are_merged_on_open(db_path):
+    _legacy_database(db_path)
+
+    with DatabaseManager(db_path) as db:
+        conn = db._conn
+        assert conn.execute('SELECT id, taxid, name, family, taxonomy FROM organisms ORDER BY id').fetchall() == [
+            (1, "224129", "Agrilus planipennis", "Buprestidae", '["Insecta"]'),
+            (3, None, "Agrilus anxius", None, None)
+        ]
+        assert conn.execute('SELECT DISTINCT organism_id FROM sequences').fetchall() == [(1,)]
+        assert conn.execute('SELECT organism_id FROM bioprojects').fetchall() == [(1,)]
+        assert conn.execute('SELECT organism_id FROM sra_runs').fetchall() == [(1,)]
+
+        assert db.insert_organism("Agrilus planipennis") == 1
+
+
+def test_insert_organism_returns_existing_id(db_path):
+    with DatabaseManager(db_path) as db:
+        organism_id = db.insert_organism("Agrilus planipennis", taxid="224129", family="Buprestidae")
+
+        assert db.insert_organism("Agrilus planipennis") == organism_id
+        assert db.insert_organism("Agrilus planipennis", taxid="224129") == organism_id
+
+
+def test_insert_organism_with_taxid_of_another_name(db_path):
+    with DatabaseManager(db_path) as db:
+        first_id = db.insert_organism("Agrilus planipennis", taxid="224129")
+        second_id = db.insert_organism("Agrilus marcopoli", taxid="224129")
+
+        assert second_id != first_id
+        assert db._conn.execute('SELECT taxid FROM organisms WHERE id = ?', (second_id,)).fetchone() == (None,)